@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from functools import lru_cache
+from functools import cached_property, lru_cache
 
 
 class Settings(BaseSettings):
@@ -11,13 +11,40 @@ class Settings(BaseSettings):
     allowed_origins: str = "http://localhost:3000,http://localhost:5173"
     # Optional regex for CORS origins (e.g. r"^https://.*\.vercel\.app$")
     allowed_origin_regex: str = ""
+    # Upload size limits (MB)
+    max_cv_upload_mb: int = 10
+    max_audio_upload_mb: int = 25
+    # Optional external session store: "redis" or "memcached" (empty = Supabase / in-memory)
+    session_backend: str = ""
+    redis_url: str = "redis://localhost:6379/0"
+    memcached_host: str = "localhost"
+    memcached_port: int = 11211
+    session_ttl_seconds: int = 24 * 3600
+    # Opt-in: hot sessions kept in-process on top of Supabase/Redis/Memcached (0 = off).
+    # Only for single-worker deployments: other workers never invalidate the pool, so
+    # with several workers each would serve its own stale copy.
+    session_pool_size: int = 0
+    # Max sessions held by the in-memory fallback store (oldest evicted first)
+    memory_session_limit: int = 10_000
+    # Byte budgets (MB) for files kept in memory: the storage fallback, and copies of
+    # files uploaded to Supabase (least recently used dropped first)
+    memory_storage_max_mb: int = 256
+    local_copies_max_mb: int = 64
+    # OpenAI throttling: max in-flight requests, and requests per minute (0 = unlimited)
+    openai_max_concurrency: int = 16
+    openai_requests_per_minute: int = 0
+    # Route bulk CV parsing (parse_cvs_batch) through the OpenAI Batch API (results within 24h)
+    use_batch_api: bool = False
+    # Reuse OpenAI replies for identical CV parses / gap analyses (0 disables)
+    ai_cache_size: int = 256
+    ai_cache_ttl_seconds: int = 3600
     
     class Config:
         env_file = ".env"
 
-    @property
-    def allowed_origins_list(self) -> list[str]:
-        return [o.strip() for o in (self.allowed_origins or "").split(",") if o.strip()]
+    @cached_property
+    def allowed_origins_list(self) -> tuple[str, ...]:
+        return tuple(o.strip() for o in (self.allowed_origins or "").split(",") if o.strip())
 
 
 @lru_cache()
@@ -1,19 +1,23 @@
+import threading
+
 from supabase import create_client, Client
 from app.config import get_settings
 
 settings = get_settings()
 
-_supabase_client: Client | None = None
+# Built once; the lock makes concurrent first calls (threadpool workers) share one client
+_client: Client | None = None
+_client_lock = threading.Lock()
 
 
 def get_supabase() -> Client | None:
     """Get Supabase client (singleton)."""
-    global _supabase_client
-    
+    global _client
     if not settings.supabase_url or not settings.supabase_key:
         return None
-    
-    if _supabase_client is None:
-        _supabase_client = create_client(settings.supabase_url, settings.supabase_key)
-    
-    return _supabase_client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_client(settings.supabase_url, settings.supabase_key)
+    return _client
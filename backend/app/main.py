@@ -1,34 +1,103 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+import asyncio
+from typing import Any
+import orjson
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from app.config import get_settings
 from app.models import (
     CreateSessionResponse, AnalyzeRequest, AnswerRequest, 
-    GenerateRequest, SessionStatus, GapAnalysis
+    GenerateRequest, Session, SessionStatus, GapAnalysis, QUESTION_LIST_ADAPTER
 )
 from app.session_store import create_session, get_session, update_session, delete_session
 from app.services.pdf_parser import extract_text_from_pdf
 from app.services.ai_service import (
     parse_cv_with_ai, analyze_gaps, generate_questions_from_gaps, 
-    transcribe_audio, generate_optimized_cv_with_comparison
+    transcribe_audio, generate_optimized_cv_with_comparison, AIResponseTruncatedError
 )
-from app.services.cv_generator import create_cv_docx, create_cv_pdf
-from app.services.storage import upload_file, get_file
+from app.services.cv_generator import create_cv_docx, create_cv_pdf, prepare_cv_content
+from app.services.storage import upload_file, iter_file, create_signed_url, forget_local_copies
 
-app = FastAPI(title="CV Optimizer API", version="1.0.0")
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (faster, fewer allocations than json.dumps)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+app = FastAPI(title="CV Optimizer API", version="1.0.0", default_response_class=ORJSONResponse)
 
 settings = get_settings()
 
+# Body size limits for upload endpoints, checked before the body is read
+_UPLOAD_LIMITS_MB = {
+    "/api/v1/cv/upload": settings.max_cv_upload_mb,
+    "/api/v1/interview/voice": settings.max_audio_upload_mb,
+    "/api/v1/transcribe": settings.max_audio_upload_mb,
+}
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Reject uploads whose declared Content-Length exceeds the endpoint limit."""
+    limit_mb = _UPLOAD_LIMITS_MB.get(request.url.path)
+    content_length = request.headers.get("content-length")
+    if limit_mb and content_length and content_length.isdigit() and int(content_length) > limit_mb * 1024 * 1024:
+        return ORJSONResponse({"detail": f"File too large (max {limit_mb} MB)"}, status_code=413)
+    return await call_next(request)
+
+
+@app.exception_handler(AIResponseTruncatedError)
+async def ai_reply_truncated(request: Request, exc: AIResponseTruncatedError):
+    """A cut-off model reply is an upstream failure, not a server bug."""
+    return ORJSONResponse({"detail": f"{exc}. Please try again."}, status_code=502)
+
+
+def _check_upload_size(file: UploadFile, limit_mb: int) -> None:
+    """Enforce the limit on the received file too (e.g. chunked requests without Content-Length)."""
+    if file.size is not None and file.size > limit_mb * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"File too large (max {limit_mb} MB)")
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
     allow_origin_regex=settings.allowed_origin_regex or None,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 
+async def _load_session(request: Request, session_id: str) -> Session:
+    """Fetch the session once per request (kept on request.state) or raise 404."""
+    session = await get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    request.state.session = session
+    return session
+
+
+async def session_dep(request: Request, session_id: str) -> Session:
+    """Session named by a `session_id` path or query parameter."""
+    return await _load_session(request, session_id)
+
+
+async def form_session_dep(request: Request, session_id: str = Form(...)) -> Session:
+    """Session named by a `session_id` form field."""
+    return await _load_session(request, session_id)
+
+
+async def body_session_dep(request: Request) -> Session:
+    """Session named by the `session_id` field of the JSON body."""
+    body = await request.json()
+    session_id = body.get("session_id") if isinstance(body, dict) else None
+    if not isinstance(session_id, str):
+        raise HTTPException(status_code=422, detail="session_id is required")
+    return await _load_session(request, session_id)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -37,30 +106,25 @@ async def health_check():
 @app.post("/api/v1/session/create", response_model=CreateSessionResponse)
 async def create_new_session():
     """Create a new session."""
-    session = create_session()
+    session = await create_session()
     return CreateSessionResponse(session_id=session.id)
 
 
 @app.post("/api/v1/cv/upload")
-async def upload_cv(session_id: str = Form(...), file: UploadFile = File(...)):
+async def upload_cv(session: Session = Depends(form_session_dep), file: UploadFile = File(...)):
     """Upload and parse CV."""
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    _check_upload_size(file, settings.max_cv_upload_mb)
     
-    pdf_bytes = await file.read()
-    
-    # Extract text from PDF
+    # Extract text straight from the spooled upload (no full in-memory copy)
     try:
-        cv_text = extract_text_from_pdf(pdf_bytes)
+        cv_text = await asyncio.to_thread(extract_text_from_pdf, file.file)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
     # Store original file
-    file_url = await upload_file(pdf_bytes, file.filename, "application/pdf")
+    file_url = await upload_file(file, file.filename, "application/pdf")
     
     # Parse CV with AI
     parsed_cv = await parse_cv_with_ai(cv_text)
@@ -69,7 +133,7 @@ async def upload_cv(session_id: str = Form(...), file: UploadFile = File(...)):
     session.original_cv_url = file_url
     session.parsed_cv = parsed_cv
     session.status = SessionStatus.CV_UPLOADED
-    update_session(session)
+    await update_session(session)
     
     return {
         "success": True,
@@ -79,12 +143,8 @@ async def upload_cv(session_id: str = Form(...), file: UploadFile = File(...)):
 
 
 @app.post("/api/v1/analyze")
-async def analyze_cv(request: AnalyzeRequest):
+async def analyze_cv(request: AnalyzeRequest, session: Session = Depends(body_session_dep)):
     """Analyze gaps between CV and job description."""
-    session = get_session(request.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     if not session.parsed_cv:
         raise HTTPException(status_code=400, detail="Please upload a CV first")
     
@@ -98,8 +158,9 @@ async def analyze_cv(request: AnalyzeRequest):
     session.job_description = request.job_description
     session.gap_analysis = gap_analysis
     session.questions = questions
+    session.index_questions()
     session.status = SessionStatus.ANALYZED
-    update_session(session)
+    await update_session(session)
     
     return {
         "success": True,
@@ -110,41 +171,27 @@ async def analyze_cv(request: AnalyzeRequest):
 
 
 @app.get("/api/v1/interview/questions")
-async def get_questions(session_id: str):
+async def get_questions(session: Session = Depends(session_dep)):
     """Get interview questions."""
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     if not session.questions:
         raise HTTPException(status_code=400, detail="Please analyze CV first")
     
     return {
-        "questions": [q.model_dump() for q in session.questions],
+        "questions": QUESTION_LIST_ADAPTER.dump_python(session.questions),
         "current_index": session.current_question_index,
         "total": len(session.questions)
     }
 
 
-@app.post("/api/v1/interview/answer")
-async def submit_answer(request: AnswerRequest):
-    """Submit answer to a question."""
-    session = get_session(request.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Find and update question
-    for q in session.questions:
-        if q.id == request.question_id:
-            q.answer = request.answer_text
-            q.answered = True
-            break
+async def _record_answer(session: Session, question_id: str, answer_text: str) -> dict:
+    """Save an answer, advance the interview and persist the session once."""
+    session.answer_question(question_id, answer_text)
     
     # Update current index
-    answered_count = sum(1 for q in session.questions if q.answered)
+    answered_count = session.answered_count
     session.current_question_index = answered_count
     session.status = SessionStatus.INTERVIEWING
-    update_session(session)
+    await update_session(session)
     
     return {
         "success": True,
@@ -154,62 +201,44 @@ async def submit_answer(request: AnswerRequest):
     }
 
 
+@app.post("/api/v1/interview/answer")
+async def submit_answer(request: AnswerRequest, session: Session = Depends(body_session_dep)):
+    """Submit answer to a question."""
+    return await _record_answer(session, request.question_id, request.answer_text)
+
+
 @app.post("/api/v1/interview/voice")
 async def submit_voice_answer(
-    session_id: str = Form(...),
+    session: Session = Depends(form_session_dep),
     question_id: str = Form(...),
     audio: UploadFile = File(...)
 ):
     """Submit voice answer - transcribe and save."""
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    audio_bytes = await audio.read()
+    _check_upload_size(audio, settings.max_audio_upload_mb)
     
     # Transcribe audio
-    transcription = await transcribe_audio(audio_bytes, audio.filename)
+    transcription = await transcribe_audio(audio.file, audio.filename, audio.content_type)
     
-    # Find and update question
-    for q in session.questions:
-        if q.id == question_id:
-            q.answer = transcription
-            q.answered = True
-            break
-    
-    answered_count = sum(1 for q in session.questions if q.answered)
-    session.current_question_index = answered_count
-    session.status = SessionStatus.INTERVIEWING
-    update_session(session)
-    
-    return {
-        "success": True,
-        "transcription": transcription,
-        "answered": answered_count,
-        "total": len(session.questions)
-    }
+    result = await _record_answer(session, question_id, transcription)
+    return {"transcription": transcription, **result}
 
 
 @app.post("/api/v1/transcribe")
 async def transcribe_only(audio: UploadFile = File(...)):
     """Transcribe audio without saving - returns text only."""
-    audio_bytes = await audio.read()
-    transcription = await transcribe_audio(audio_bytes, audio.filename)
+    _check_upload_size(audio, settings.max_audio_upload_mb)
+    transcription = await transcribe_audio(audio.file, audio.filename, audio.content_type)
     return {"transcription": transcription}
 
 
 @app.post("/api/v1/cv/generate")
-async def generate_cv(request: GenerateRequest):
+async def generate_cv(request: GenerateRequest, session: Session = Depends(body_session_dep)):
     """Generate optimized CV with comparison."""
-    session = get_session(request.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     if not session.parsed_cv or not session.job_description or not session.gap_analysis:
         raise HTTPException(status_code=400, detail="Missing CV, job description, or analysis")
     
     session.status = SessionStatus.GENERATING
-    update_session(session)
+    await update_session(session)
     
     # Generate optimized CV with comparison
     optimized_cv, comparison = await generate_optimized_cv_with_comparison(
@@ -219,21 +248,26 @@ async def generate_cv(request: GenerateRequest):
         session.questions
     )
     
-    # Create files
-    docx_bytes = create_cv_docx(optimized_cv)
-    pdf_bytes = create_cv_pdf(optimized_cv)
+    # Create both files concurrently, off the event loop, from shared pre-rendered content
+    rendered = prepare_cv_content(optimized_cv)
+    docx_bytes, pdf_bytes = await asyncio.gather(
+        asyncio.to_thread(create_cv_docx, optimized_cv, rendered),
+        asyncio.to_thread(create_cv_pdf, optimized_cv, rendered),
+    )
     
-    # Upload files
-    docx_url = await upload_file(docx_bytes, "optimized_cv.docx", 
-                                  "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-    pdf_url = await upload_file(pdf_bytes, "optimized_cv.pdf", "application/pdf")
+    # Upload files concurrently
+    docx_url, pdf_url = await asyncio.gather(
+        upload_file(docx_bytes, "optimized_cv.docx",
+                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+        upload_file(pdf_bytes, "optimized_cv.pdf", "application/pdf"),
+    )
     
     session.generated_cv_url = pdf_url
     session.generated_docx_url = docx_url
     session.optimized_cv = optimized_cv
     session.cv_comparison = comparison
     session.status = SessionStatus.COMPLETED
-    update_session(session)
+    await update_session(session)
     
     return {
         "success": True,
@@ -244,30 +278,32 @@ async def generate_cv(request: GenerateRequest):
     }
 
 
+async def _file_download(file_url: str, media_type: str, filename: str) -> Response:
+    """Redirect to a signed storage URL when possible, otherwise stream through the API."""
+    signed_url = await create_signed_url(file_url, download_name=filename)
+    if signed_url:
+        return RedirectResponse(url=signed_url, status_code=307)
+    return StreamingResponse(
+        iter_file(file_url),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @app.get("/api/v1/cv/download/{file_type}")
-async def download_cv(session_id: str, file_type: str):
+async def download_cv(file_type: str, session: Session = Depends(session_dep)):
     """Download generated CV."""
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     if file_type == "pdf":
         if not session.generated_cv_url:
             raise HTTPException(status_code=404, detail="PDF not generated yet")
-        file_bytes = await get_file(session.generated_cv_url)
-        return Response(
-            content=file_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=optimized_cv.pdf"}
-        )
+        return await _file_download(session.generated_cv_url, "application/pdf", "optimized_cv.pdf")
     elif file_type == "docx":
         if not session.generated_docx_url:
             raise HTTPException(status_code=404, detail="DOCX not generated yet")
-        file_bytes = await get_file(session.generated_docx_url)
-        return Response(
-            content=file_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=optimized_cv.docx"}
+        return await _file_download(
+            session.generated_docx_url,
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "optimized_cv.docx"
         )
     else:
         raise HTTPException(status_code=400, detail="Invalid file type")
@@ -275,8 +311,17 @@ async def download_cv(session_id: str, file_type: str):
 
 @app.delete("/api/v1/session/{session_id}")
 async def delete_user_session(session_id: str):
-    """Delete session and all user data (GDPR)."""
-    success = delete_session(session_id)
+    """
+    Delete session and all user data (GDPR).
+    Not covered: recent OpenAI replies held in process memory by ai_cache. They are
+    keyed by content, not by session, and expire after AI_CACHE_TTL_SECONDS (set
+    AI_CACHE_SIZE=0 to keep none).
+    """
+    session = await get_session(session_id)
+    if session:
+        forget_local_copies(session.generated_cv_url, session.generated_docx_url)
+    
+    success = await delete_session(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -284,42 +329,24 @@ async def delete_user_session(session_id: str):
 
 
 @app.get("/api/v1/session/{session_id}")
-async def get_session_status(session_id: str):
+async def get_session_status(session: Session = Depends(session_dep)):
     """Get current session status."""
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
     return {
         "id": session.id,
         "status": session.status,
         "has_cv": session.parsed_cv is not None,
         "has_analysis": session.gap_analysis is not None,
-        "questions_answered": sum(1 for q in session.questions if q.answered),
+        "questions_answered": session.answered_count,
         "total_questions": len(session.questions),
         "has_generated_cv": session.generated_cv_url is not None
     }
 
 
 @app.get("/api/v1/session/{session_id}/data")
-async def get_session_data(session_id: str):
+async def get_session_data(session: Session = Depends(session_dep)):
     """
     Get session data needed to restore UI state after refresh.
     Note: protected only by session_id (UUID). If you add auth later, lock this down.
     """
-    session = get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    return {
-        "id": session.id,
-        "status": session.status,
-        "job_description": session.job_description,
-        "gap_analysis": session.gap_analysis.model_dump() if session.gap_analysis else None,
-        "questions": [q.model_dump() for q in (session.questions or [])],
-        "current_question_index": session.current_question_index,
-        "has_generated_cv": session.generated_cv_url is not None,
-        "generated_cv_url": session.generated_cv_url,
-        "generated_docx_url": session.generated_docx_url,
-        "comparison": session.cv_comparison.model_dump() if session.cv_comparison else None,
-    }
+    # Serialized once per session change; repeated UI refreshes reuse the bytes
+    return Response(content=session.data_json(), media_type="application/json")
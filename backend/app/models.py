@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -81,7 +81,23 @@ class InterviewQuestion(BaseModel):
     answer: Optional[str] = None
 
 
+def utcnow() -> datetime:
+    """Current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+# Compiled once; dumps a whole question list in a single call instead of one model_dump() per item
+QUESTION_LIST_ADAPTER = TypeAdapter(list[InterviewQuestion])
+
+
+# Session fields stored as nested JSON, which can change in place without an assignment
+_NESTED_FIELDS = ("parsed_cv", "gap_analysis", "questions", "optimized_cv", "cv_comparison")
+
+
 class Session(BaseModel):
+    # Routes reassign status/index on every step; skip revalidating those writes
+    model_config = ConfigDict(validate_assignment=False)
+
     id: str
     status: SessionStatus = SessionStatus.STARTED
     original_cv_url: Optional[str] = None
@@ -94,7 +110,103 @@ class Session(BaseModel):
     generated_docx_url: Optional[str] = None
     optimized_cv: Optional[ParsedCV] = None
     cv_comparison: Optional[CVComparison] = None
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=utcnow)
+
+    # Question lookup by id and running answered count, kept in sync with `questions`
+    _questions_by_id: dict[str, InterviewQuestion] = PrivateAttr(default_factory=dict)
+    _answered_count: int = PrivateAttr(default=0)
+    # Serialized SessionData payload, rebuilt after the session changes
+    _data_json: Optional[bytes] = PrivateAttr(default=None)
+    # Fields assigned since the session was last saved (the store writes only these).
+    # Assign, don't mutate: in-place changes to nested values should go through a
+    # Session method that marks the field (see answer_question) or reassign it.
+    # Nested JSON fields are also fingerprinted at each save, so an in-place change
+    # that skipped both is still detected and written rather than lost.
+    _dirty: set[str] = PrivateAttr(default_factory=set)
+    _saved_digests: dict[str, int] = PrivateAttr(default_factory=dict)
+    # Last read or save by this process; the session TTL counts from here
+    _last_accessed: datetime = PrivateAttr(default_factory=utcnow)
+
+    def model_post_init(self, __context) -> None:
+        self.index_questions()
+        self._saved_digests = self._nested_digests()
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in Session.model_fields:
+            self._dirty.add(name)
+        super().__setattr__(name, value)
+
+    @property
+    def last_accessed(self) -> datetime:
+        return self._last_accessed
+
+    def touch(self) -> None:
+        """Record an access, pushing back the session's expiry."""
+        self._last_accessed = utcnow()
+
+    def mark_dirty(self, *names: str) -> None:
+        self._dirty.update(names)
+
+    def _nested_digests(self) -> dict[str, int]:
+        digests = {}
+        for name in _NESTED_FIELDS:
+            value = getattr(self, name)
+            if name == "questions":
+                digests[name] = hash(QUESTION_LIST_ADAPTER.dump_json(value))
+            else:
+                digests[name] = hash(value.model_dump_json()) if value is not None else 0
+        return digests
+
+    def pop_dirty_fields(self) -> set[str]:
+        """Fields changed since the last call, for a partial save."""
+        digests = self._nested_digests()
+        dirty, self._dirty = self._dirty, set()
+        dirty.update(name for name, digest in digests.items() if self._saved_digests.get(name) != digest)
+        self._saved_digests = digests
+        return dirty
+
+    def index_questions(self) -> None:
+        """Rebuild the question lookup; call after replacing `questions`."""
+        self._questions_by_id = {}
+        for q in self.questions:
+            self._questions_by_id.setdefault(q.id, q)
+        self._answered_count = sum(1 for q in self.questions if q.answered)
+
+    @property
+    def answered_count(self) -> int:
+        return self._answered_count
+
+    def answer_question(self, question_id: str, answer: str) -> None:
+        """Record an answer for the question with the given id (ignored if unknown)."""
+        q = self._questions_by_id.get(question_id)
+        if q is None:
+            return
+        if not q.answered:
+            self._answered_count += 1
+        q.answer = answer
+        q.answered = True
+        self._dirty.add("questions")
+
+    def data_json(self) -> bytes:
+        """Serialized SessionData for this session (cached until the next change)."""
+        if self._data_json is None:
+            self._data_json = SessionData(
+                id=self.id,
+                status=self.status,
+                job_description=self.job_description,
+                gap_analysis=self.gap_analysis,
+                questions=self.questions,
+                current_question_index=self.current_question_index,
+                has_generated_cv=self.generated_cv_url is not None,
+                generated_cv_url=self.generated_cv_url,
+                generated_docx_url=self.generated_docx_url,
+                comparison=self.cv_comparison,
+            ).model_dump_json().encode()
+        return self._data_json
+
+    def clear_cached_payloads(self) -> None:
+        """Drop serialized payloads after the session has been mutated."""
+        self._data_json = None
 
 
 # Request/Response Models
@@ -115,3 +227,17 @@ class AnswerRequest(BaseModel):
 
 class GenerateRequest(BaseModel):
     session_id: str
+
+
+class SessionData(BaseModel):
+    """State needed by the UI to restore itself after a refresh."""
+    id: str
+    status: SessionStatus
+    job_description: Optional[str] = None
+    gap_analysis: Optional[GapAnalysis] = None
+    questions: list[InterviewQuestion] = []
+    current_question_index: int = 0
+    has_generated_cv: bool = False
+    generated_cv_url: Optional[str] = None
+    generated_docx_url: Optional[str] = None
+    comparison: Optional[CVComparison] = None
@@ -0,0 +1,66 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+import orjson
+from app.config import get_settings
+
+settings = get_settings()
+
+# sha256(request options + system prompt + input) -> (stored_at, reply content), LRU order
+_responses: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def _cache_key(key_text: str, create_kwargs: dict) -> str:
+    # Every option except the messages (model, max_tokens, sampling, seed, response_format)
+    # can change the reply, so all of them are part of the key
+    options = orjson.dumps(
+        {k: v for k, v in create_kwargs.items() if k != "messages"}, option=orjson.OPT_SORT_KEYS
+    )
+    system = next((m["content"] for m in create_kwargs["messages"] if m["role"] == "system"), "")
+    digest = hashlib.sha256(options)
+    digest.update((system + key_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _get(key: str) -> str | None:
+    entry = _responses.get(key)
+    if entry is None:
+        return None
+    stored_at, content = entry
+    if time.monotonic() - stored_at > settings.ai_cache_ttl_seconds:
+        del _responses[key]
+        return None
+    _responses.move_to_end(key)
+    return content
+
+
+def _put(key: str, content: str) -> None:
+    _responses[key] = (time.monotonic(), content)
+    _responses.move_to_end(key)
+    while len(_responses) > settings.ai_cache_size:
+        _responses.popitem(last=False)
+
+
+async def cached_chat(
+    key_text: str,
+    create_kwargs: dict,
+    create: Callable[..., Awaitable[Any]],
+) -> str:
+    """
+    Return the reply content for a chat completion, reusing a recent reply when the
+    same request options, system prompt and input text were sent before.
+    Only exact matches are reused: near-duplicate CVs may differ in exactly the
+    details (contact info, dates) the caller is asking about.
+    """
+    if settings.ai_cache_size <= 0:
+        response = await create(**create_kwargs)
+        return response.choices[0].message.content
+
+    key = _cache_key(key_text, create_kwargs)
+    content = _get(key)
+    if content is None:
+        response = await create(**create_kwargs)
+        content = response.choices[0].message.content
+        _put(key, content)
+    return content
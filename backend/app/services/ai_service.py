@@ -1,14 +1,75 @@
-import json
+import asyncio
+import time
+import orjson
 import uuid
+from itertools import chain
+from typing import BinaryIO
 from openai import AsyncOpenAI
+from pydantic import TypeAdapter
 from app.config import get_settings
 from app.models import ParsedCV, GapAnalysis, Gap, InterviewQuestion, CVComparison
+from app.services.ai_cache import cached_chat
 import re
 
 settings = get_settings()
 client = AsyncOpenAI(api_key=settings.openai_api_key)
 
-_PLACEHOLDER_VALUES = {
+# Model replies are untrusted JSON, so ParsedCVs are always fully validated;
+# the adapter just keeps one compiled validator for all of them
+_PARSED_CV_ADAPTER = TypeAdapter(ParsedCV)
+
+
+class _RequestBucket:
+    """Token bucket spacing OpenAI requests to stay under a requests-per-minute budget."""
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+_OPENAI_SEM = asyncio.Semaphore(max(1, settings.openai_max_concurrency))
+_OPENAI_BUCKET = _RequestBucket(settings.openai_requests_per_minute)
+
+
+class AIResponseTruncatedError(RuntimeError):
+    """The model stopped at its output cap, so the reply is incomplete JSON."""
+
+
+async def _create_completion(**kwargs):
+    async with _OPENAI_SEM:
+        await _OPENAI_BUCKET.acquire()
+        return await client.chat.completions.create(**kwargs)
+
+
+async def _chat_completion(**kwargs):
+    """
+    chat.completions.create, capped by the concurrency and RPM limits.
+    A reply cut off by max_tokens is retried once with twice the cap; if that is cut
+    off too, AIResponseTruncatedError is raised instead of returning partial JSON.
+    """
+    response = await _create_completion(**kwargs)
+    if response.choices[0].finish_reason == "length" and kwargs.get("max_tokens"):
+        response = await _create_completion(**{**kwargs, "max_tokens": kwargs["max_tokens"] * 2})
+    if response.choices[0].finish_reason == "length":
+        raise AIResponseTruncatedError("The AI reply was too long and got cut off")
+    return response
+
+
+_PLACEHOLDER_VALUES = frozenset({
     "string",
     "none",
     "n/a",
@@ -16,7 +77,81 @@ _PLACEHOLDER_VALUES = {
     "null",
     "undefined",
     "tbd",
-}
+})
+
+# Contact-info fallbacks for parse_cv_with_ai
+# A phone needs a shape year ranges and ID numbers lack: a leading "+", an area code
+# in parentheses, a national trunk "0", or North American 3-3-4 grouping. Atomic
+# groups keep long digit runs from backtracking.
+_PHONE_RE = re.compile(
+    r'(?<![\w+])(?:'
+    # International: +country code, then 6+ more digits in groups
+    r'\+\d{1,3}(?=(?:[-.\s()]*\d){6})(?>[-.\s]?\(?\d{1,4}\)?){2,5}'
+    # Area code in parentheses: (555) 123-4567
+    r'|\(\d{2,4}\)[-.\s]?\d{2,4}(?>[-.\s]?\d{2,4}){1,3}'
+    # National number with a trunk 0: 06 12 34 56 78, 0171 234 5678
+    r'|0\d{1,4}(?>[-.\s]?\d{2,4}){2,4}'
+    # North American 3-3-4: 555-123-4567, or unseparated: 5551234567
+    r'|\d{3}[-.\s]\d{3}[-.\s]\d{4}'
+    r'|[2-9]\d{9}'
+    # 8-digit local number in 2-3-3 groups: 54 051 820
+    r'|\d{2}[-.\s]\d{3}[-.\s]\d{3}'
+    r')(?![-.]?\d)'
+)
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_LINKEDIN_RE = re.compile(r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w-]+', re.IGNORECASE)
+# Contact details almost always sit in the CV header; search there before the full text
+_CONTACT_HEAD_CHARS = 4096
+
+# Gap description keywords used to group interview questions. Plain substring
+# matches (no word boundaries), e.g. "sql" also matches "PostgreSQL".
+_TECH_KEYWORDS = ("python", "java", "aws", "docker", "kubernetes", "react", "node",
+                  "sql", "api", "cloud", "devops", "ci/cd", "testing", "database",
+                  "frontend", "backend", "fullstack", "microservices", "agile")
+_SOFT_KEYWORDS = ("leadership", "team", "communication", "management", "collaboration",
+                  "stakeholder", "mentor", "cross-functional")
+# One scan per description; the lookahead tries every position so overlapping
+# keywords are still seen, and a technical keyword anywhere takes priority.
+_KEYWORD_RE = re.compile(
+    "(?=(?P<tech>" + "|".join(map(re.escape, _TECH_KEYWORDS)) + ")"
+    "|(?P<soft>" + "|".join(map(re.escape, _SOFT_KEYWORDS)) + "))",
+    re.IGNORECASE,
+)
+
+
+# CV text sent for parsing (~6K tokens at ~4 chars/token); longer text is mostly
+# publications/references and only adds latency and TPM pressure
+_MAX_CV_PROMPT_CHARS = 24_000
+
+# Output caps per call: well above a normal reply (so long CVs are not cut off
+# mid-JSON) but low enough that a runaway reply fails fast
+_PARSE_CV_MAX_TOKENS = 4000
+_ANALYZE_GAPS_MAX_TOKENS = 2000
+_OPTIMIZE_CV_MAX_TOKENS = 6000
+
+# Skills listed in the gap-analysis prompt (keyword-stuffed CVs can list hundreds)
+_MAX_SUMMARY_SKILLS = 80
+
+# Default gap id prefix per GapAnalysis list
+_GAP_ID_PREFIXES = (
+    ("skills_gaps", "skill"),
+    ("experience_gaps", "exp"),
+    ("keywords_gaps", "keyword"),
+    ("metrics_gaps", "metric"),
+)
+
+_IMPORTANCE_ORDER = {"high": 0, "medium": 1, "low": 2}
+_IMPORTANCE_GET = _IMPORTANCE_ORDER.get
+
+
+def _keyword_group(description: str) -> str | None:
+    """Return "tech", "soft" or None for a gap description."""
+    group = None
+    for match in _KEYWORD_RE.finditer(description):
+        if match.lastgroup == "tech":
+            return "tech"
+        group = "soft"
+    return group
 
 
 def _clean_str_list(values: list[str] | None) -> list[str]:
@@ -31,23 +166,19 @@ def _clean_str_list(values: list[str] | None) -> list[str]:
         s = str(v).strip()
         if not s:
             continue
-        # Collapse whitespace
-        s = re.sub(r"\s{2,}", " ", s)
-        if s.lower() in _PLACEHOLDER_VALUES:
-            continue
+        # Collapse whitespace (split/join only when there is something to collapse)
+        if "  " in s or "\t" in s or "\n" in s:
+            s = " ".join(s.split())
         key = s.lower()
-        if key in seen:
+        if key in _PLACEHOLDER_VALUES or key in seen:
             continue
         seen.add(key)
         out.append(s)
     return out
 
 
-async def parse_cv_with_ai(cv_text: str) -> ParsedCV:
-    """Parse CV text into structured format using GPT with regex fallback for contact info."""
-    import re
-    
-    system_prompt = """You are a CV parser. Extract and structure the CV text into JSON format.
+# System prompts (built once at import, shared by every request)
+_PARSE_CV_SYSTEM_PROMPT = """You are a CV parser. Extract and structure the CV text into JSON format.
 
 IMPORTANT: Extract ALL contact information carefully:
 - Phone numbers (any format: +1-234-567-8900, (234) 567-8900, etc.)
@@ -88,51 +219,8 @@ Return ONLY valid JSON with this exact structure:
     "languages": ["string"]
 }"""
 
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Parse this CV:\n\n{cv_text}"}
-        ],
-        temperature=0.1,
-        response_format={"type": "json_object"}
-    )
-    
-    result = json.loads(response.choices[0].message.content)
-    
-    # REGEX FALLBACK: Ensure contact info wasn't missed
-    personal_info = result.get("personal_info", {})
-    
-    # Phone regex fallback
-    if not personal_info.get("phone"):
-        phone_pattern = r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}'
-        phone_match = re.search(phone_pattern, cv_text)
-        if phone_match:
-            personal_info["phone"] = phone_match.group().strip()
-    
-    # Email regex fallback
-    if not personal_info.get("email"):
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_match = re.search(email_pattern, cv_text)
-        if email_match:
-            personal_info["email"] = email_match.group().strip()
-    
-    # LinkedIn regex fallback
-    if not personal_info.get("linkedin"):
-        linkedin_pattern = r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w-]+'
-        linkedin_match = re.search(linkedin_pattern, cv_text, re.IGNORECASE)
-        if linkedin_match:
-            personal_info["linkedin"] = linkedin_match.group().strip()
-    
-    result["personal_info"] = personal_info
-    result["raw_text"] = cv_text
-    return ParsedCV(**result)
 
-
-async def analyze_gaps(parsed_cv: ParsedCV, job_description: str) -> GapAnalysis:
-    """Analyze gaps between CV and job description with trackable gap IDs."""
-    
-    system_prompt = """You are a career advisor analyzing CV-to-job fit.
+_ANALYZE_GAPS_SYSTEM_PROMPT = """You are a career advisor analyzing CV-to-job fit.
 
 Analyze the CV against the job description and identify SPECIFIC, ACTIONABLE gaps.
 
@@ -161,47 +249,255 @@ Return ONLY valid JSON:
 
 Each gap MUST have a unique id (skill_1, exp_1, keyword_1, metric_1, etc.)"""
 
+
+_OPTIMIZE_CV_SYSTEM_PROMPT = """You are a senior resume writer and ATS optimization expert.
+
+YOUR TASK: Optimize the CV for the target job while PRESERVING all original information.
+
+CRITICAL RULES - DO NOT VIOLATE:
+1. NEVER remove or change contact information (email, phone, LinkedIn, location)
+2. NEVER remove any job experience - keep ALL jobs from the original
+3. NEVER change dates - use EXACT dates from the original CV
+4. NEVER change company names or locations
+5. NEVER fabricate information not in the original CV or candidate answers
+
+WHAT YOU CAN DO:
+1. REWRITE bullet points to be more impactful (use CAR format: Challenge → Action → Result)
+2. ADD information from candidate's interview answers to relevant job sections
+3. ADD keywords from job description where they naturally fit
+4. QUANTIFY achievements where the candidate provided numbers
+5. IMPROVE the professional summary to match the target job
+6. REORDER skills to prioritize job-relevant ones first
+7. ADD new skills mentioned in candidate answers
+
+BULLET POINT GUIDELINES:
+- Start with strong ACTION VERBS (Led, Developed, Implemented, Architected, Optimized)
+- Include METRICS when available (%, $, time saved, users, team size)
+- Show IMPACT, not just tasks
+- Keep each bullet to 1-2 lines
+- NO buzzwords like "passionate", "driven", "results-oriented"
+- NO generic phrases like "responsible for", "worked on"
+
+SKILLS SECTION:
+- Keep ALL original skills
+- ADD new skills from candidate answers
+- Group by category: Languages | Frameworks | Databases | DevOps | Tools
+
+Return JSON with this EXACT structure:
+{
+    "cv": {
+        "personal_info": {
+            "name": "EXACT name from original",
+            "email": "EXACT email from original",
+            "phone": "EXACT phone from original",
+            "location": "EXACT location from original",
+            "linkedin": "EXACT linkedin from original"
+        },
+        "summary": "2-3 sentence professional summary tailored to job",
+        "experience": [
+            {
+                "company": "EXACT company name from original",
+                "title": "EXACT title from original",
+                "start_date": "EXACT start date from original",
+                "end_date": "EXACT end date from original",
+                "responsibilities": [],
+                "achievements": ["Improved bullet 1", "Improved bullet 2", ...]
+            }
+        ],
+        "education": [EXACT education from original],
+        "skills": ["Skill 1", "Skill 2", ...],
+        "certifications": [EXACT from original],
+        "languages": [EXACT from original]
+    },
+    "addressed_gap_ids": ["skill_1", "exp_2", ...],
+    "improvements_made": ["Rewrote X bullet to show impact", "Added Y skill from interview", ...]
+}"""
+
+
+def _search_contact(pattern: re.Pattern, cv_text: str) -> re.Match | None:
+    """First match of `pattern`, scanning only the CV header unless it has none."""
+    match = pattern.search(cv_text, 0, _CONTACT_HEAD_CHARS)
+    # A match running into the cut-off may continue past it: redo on the full text
+    if match is None or match.end() >= _CONTACT_HEAD_CHARS:
+        match = pattern.search(cv_text)
+    return match
+
+
+def _parse_cv_request(cv_text: str) -> dict:
+    """Chat completion kwargs for parsing one CV (shared by live and batch calls)."""
+    return dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": _PARSE_CV_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Parse this CV:\n\n{cv_text[:_MAX_CV_PROMPT_CHARS]}"}
+        ],
+        temperature=0.1,
+        top_p=0.1,
+        max_tokens=_PARSE_CV_MAX_TOKENS,
+        seed=0,
+        response_format={"type": "json_object"}
+    )
+
+
+def _build_parsed_cv(cv_text: str, content: str) -> ParsedCV:
+    """Turn the model's JSON reply into a ParsedCV, filling missed contact info by regex."""
+    result = orjson.loads(content)
+    
+    # REGEX FALLBACK: Ensure contact info wasn't missed
+    personal_info = result.get("personal_info", {})
+    
+    if not (personal_info.get("phone") and personal_info.get("email") and personal_info.get("linkedin")):
+        # Phone regex fallback
+        if not personal_info.get("phone"):
+            phone_match = _search_contact(_PHONE_RE, cv_text)
+            if phone_match:
+                personal_info["phone"] = phone_match.group().strip()
+        
+        # Email regex fallback
+        if not personal_info.get("email"):
+            email_match = _search_contact(_EMAIL_RE, cv_text)
+            if email_match:
+                personal_info["email"] = email_match.group().strip()
+        
+        # LinkedIn regex fallback
+        if not personal_info.get("linkedin"):
+            linkedin_match = _search_contact(_LINKEDIN_RE, cv_text)
+            if linkedin_match:
+                personal_info["linkedin"] = linkedin_match.group().strip()
+    
+    result["personal_info"] = personal_info
+    result["raw_text"] = cv_text
+    return _PARSED_CV_ADAPTER.validate_python(result)
+
+
+async def parse_cv_with_ai(cv_text: str) -> ParsedCV:
+    """Parse CV text into structured format using GPT with regex fallback for contact info."""
+    content = await cached_chat(cv_text, _parse_cv_request(cv_text), _chat_completion)
+    return _build_parsed_cv(cv_text, content)
+
+
+async def parse_cvs_batch(cv_texts: list[str]) -> list[ParsedCV | None]:
+    """
+    Parse several CVs concurrently (still bounded by the OpenAI limits).
+    With USE_BATCH_API enabled this goes through the Batch API instead: half the cost,
+    separate rate limits, but results can take up to 24h - only for offline/bulk jobs.
+    Results line up with `cv_texts`; a CV whose request failed or expired is None.
+    """
+    if settings.use_batch_api:
+        batch_id = await submit_cv_batch(cv_texts)
+        parsed = await await_batch(batch_id, cv_texts)
+        return [parsed.get(f"cv-{i}") for i in range(len(cv_texts))]
+    results = await asyncio.gather(*(parse_cv_with_ai(t) for t in cv_texts), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+    return [None if isinstance(result, Exception) else result for result in results]
+
+
+async def submit_cv_batch(cv_texts: list[str]) -> str:
+    """Upload one parse request per CV to the Batch API; returns the batch id."""
+    lines = [
+        orjson.dumps({
+            "custom_id": f"cv-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _parse_cv_request(text),
+        })
+        for i, text in enumerate(cv_texts)
+    ]
+    batch_file = await client.files.create(
+        file=("cv_batch.jsonl", b"\n".join(lines)),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id
+
+
+async def await_batch(batch_id: str, cv_texts: list[str], poll_seconds: float = 30.0) -> dict[str, ParsedCV]:
+    """
+    Wait for a CV batch from submit_cv_batch and return its results keyed by custom_id.
+    `cv_texts` must be the list that was submitted (raw text + regex fallbacks need it).
+    Requests that failed inside the batch, or whose reply was cut off by max_tokens,
+    are left out.
+    """
+    batch = await client.batches.retrieve(batch_id)
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_seconds)
+        batch = await client.batches.retrieve(batch_id)
+    
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+    
+    output = await client.files.content(batch.output_file_id)
+    parsed: dict[str, ParsedCV] = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        custom_id = item.get("custom_id", "")
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        choice = response["body"]["choices"][0]
+        if choice.get("finish_reason") == "length":
+            continue
+        index = int(custom_id.removeprefix("cv-"))
+        content = choice["message"]["content"]
+        parsed[custom_id] = _build_parsed_cv(cv_texts[index], content)
+    return parsed
+
+
+async def analyze_gaps(parsed_cv: ParsedCV, job_description: str) -> GapAnalysis:
+    """Analyze gaps between CV and job description with trackable gap IDs."""
+    
+    experience_json = orjson.dumps([{
+        "company": e.company,
+        "title": e.title,
+        "duration": f"{e.start_date or 'N/A'} - {e.end_date or 'Present'}",
+        "responsibilities": e.responsibilities[:4],
+        "achievements": e.achievements[:4]
+    } for e in parsed_cv.experience], option=orjson.OPT_INDENT_2).decode()
+    education_json = orjson.dumps(
+        [{"institution": e.institution, "degree": e.degree, "field": e.field} for e in parsed_cv.education]
+    ).decode()
+    skills_str = ', '.join(parsed_cv.skills[:_MAX_SUMMARY_SKILLS])
+    cert_str = ', '.join(parsed_cv.certifications) or 'None listed'
+
     cv_summary = f"""
 Name: {parsed_cv.personal_info.name}
 Summary: {parsed_cv.summary}
-Skills: {', '.join(parsed_cv.skills)}
-Certifications: {', '.join(parsed_cv.certifications) if parsed_cv.certifications else 'None listed'}
+Skills: {skills_str}
+Certifications: {cert_str}
 Experience ({len(parsed_cv.experience)} positions):
-{json.dumps([{
-    "company": e.company, 
-    "title": e.title, 
-    "duration": f"{e.start_date or 'N/A'} - {e.end_date or 'Present'}",
-    "responsibilities": e.responsibilities[:4],
-    "achievements": e.achievements[:4]
-} for e in parsed_cv.experience], indent=2)}
-Education: {json.dumps([{"institution": e.institution, "degree": e.degree, "field": e.field} for e in parsed_cv.education])}
+{experience_json}
+Education: {education_json}
 """
 
-    response = await client.chat.completions.create(
+    user_content = f"CV:\n{cv_summary}\n\nJob Description:\n{job_description}"
+    content = await cached_chat(user_content, dict(
         model="gpt-4o-mini",
         messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"CV:\n{cv_summary}\n\nJob Description:\n{job_description}"}
+            {"role": "system", "content": _ANALYZE_GAPS_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content}
         ],
         temperature=0.3,
+        top_p=0.1,
+        max_tokens=_ANALYZE_GAPS_MAX_TOKENS,
+        seed=0,
         response_format={"type": "json_object"}
-    )
+    ), _chat_completion)
     
-    result = json.loads(response.choices[0].message.content)
+    result = orjson.loads(content)
     
     # Ensure all gaps have IDs
-    for i, gap in enumerate(result.get("skills_gaps", [])):
-        if not gap.get("id"):
-            gap["id"] = f"skill_{i+1}"
-    for i, gap in enumerate(result.get("experience_gaps", [])):
-        if not gap.get("id"):
-            gap["id"] = f"exp_{i+1}"
-    for i, gap in enumerate(result.get("keywords_gaps", [])):
-        if not gap.get("id"):
-            gap["id"] = f"keyword_{i+1}"
-    for i, gap in enumerate(result.get("metrics_gaps", [])):
-        if not gap.get("id"):
-            gap["id"] = f"metric_{i+1}"
+    for key, prefix in _GAP_ID_PREFIXES:
+        for i, gap in enumerate(result.get(key) or [], 1):
+            if not gap.get("id"):
+                gap["id"] = f"{prefix}_{i}"
     
     return GapAnalysis(**result)
 
@@ -225,7 +521,7 @@ def generate_questions_from_gaps(gap_analysis: GapAnalysis) -> list[InterviewQue
         all_gaps.append((gap, "low", "keyword"))
     
     # Sort by importance
-    all_gaps.sort(key=lambda x: {"high": 0, "medium": 1, "low": 2}.get(x[1], 2))
+    all_gaps.sort(key=lambda x: _IMPORTANCE_GET(x[1], 2))
     
     # Group similar gaps to create compound questions
     # This reduces the number of questions while covering more ground
@@ -237,22 +533,18 @@ def generate_questions_from_gaps(gap_analysis: GapAnalysis) -> list[InterviewQue
         "other": []
     }
     
-    technical_keywords = ["python", "java", "aws", "docker", "kubernetes", "react", "node", 
-                         "sql", "api", "cloud", "devops", "ci/cd", "testing", "database",
-                         "frontend", "backend", "fullstack", "microservices", "agile"]
-    soft_keywords = ["leadership", "team", "communication", "management", "collaboration",
-                    "stakeholder", "mentor", "cross-functional"]
-    
     for gap, importance, gap_category in all_gaps:
-        desc_lower = gap.description.lower()
-        
         if gap_category == "experience":
             grouped_gaps["experience"].append(gap)
-        elif gap_category == "metrics":
+            continue
+        if gap_category == "metrics":
             grouped_gaps["metrics"].append(gap)
-        elif any(kw in desc_lower for kw in technical_keywords):
+            continue
+        
+        keyword_group = _keyword_group(gap.description)
+        if keyword_group == "tech":
             grouped_gaps["technical_skills"].append(gap)
-        elif any(kw in desc_lower for kw in soft_keywords):
+        elif keyword_group == "soft":
             grouped_gaps["soft_skills"].append(gap)
         else:
             grouped_gaps["other"].append(gap)
@@ -265,7 +557,8 @@ def generate_questions_from_gaps(gap_analysis: GapAnalysis) -> list[InterviewQue
     if grouped_gaps["technical_skills"] and question_count < max_questions:
         tech_gaps = grouped_gaps["technical_skills"][:3]
         if len(tech_gaps) > 1:
-            skills_list = ", ".join([g.description for g in tech_gaps[:-1]]) + f" and {tech_gaps[-1].description}"
+            descs = [g.description for g in tech_gaps]
+            skills_list = ", ".join(descs[:-1]) + " and " + descs[-1]
             questions.append(InterviewQuestion(
                 id=tech_gaps[0].id,
                 question=f"Tell me about your experience with {skills_list}. Which have you used most recently and in what context?",
@@ -356,85 +649,29 @@ async def generate_optimized_cv_with_comparison(
             }
     
     # Get all gap descriptions for tracking
-    all_gaps = {}
-    for gap in gap_analysis.skills_gaps + gap_analysis.experience_gaps + gap_analysis.keywords_gaps + gap_analysis.metrics_gaps:
-        all_gaps[gap.id] = gap.description
+    all_gaps = {
+        gap.id: gap.description
+        for gap in chain(gap_analysis.skills_gaps, gap_analysis.experience_gaps,
+                         gap_analysis.keywords_gaps, gap_analysis.metrics_gaps)
+    }
     
     answered_info = "\n".join([
         f"Gap ID: {gap_id}\nQuestion: {info['question']}\nAnswer: {info['answer']}\n"
         for gap_id, info in answered_gaps.items()
     ])
     
-    system_prompt = """You are a senior resume writer and ATS optimization expert.
-
-YOUR TASK: Optimize the CV for the target job while PRESERVING all original information.
-
-CRITICAL RULES - DO NOT VIOLATE:
-1. NEVER remove or change contact information (email, phone, LinkedIn, location)
-2. NEVER remove any job experience - keep ALL jobs from the original
-3. NEVER change dates - use EXACT dates from the original CV
-4. NEVER change company names or locations
-5. NEVER fabricate information not in the original CV or candidate answers
-
-WHAT YOU CAN DO:
-1. REWRITE bullet points to be more impactful (use CAR format: Challenge → Action → Result)
-2. ADD information from candidate's interview answers to relevant job sections
-3. ADD keywords from job description where they naturally fit
-4. QUANTIFY achievements where the candidate provided numbers
-5. IMPROVE the professional summary to match the target job
-6. REORDER skills to prioritize job-relevant ones first
-7. ADD new skills mentioned in candidate answers
-
-BULLET POINT GUIDELINES:
-- Start with strong ACTION VERBS (Led, Developed, Implemented, Architected, Optimized)
-- Include METRICS when available (%, $, time saved, users, team size)
-- Show IMPACT, not just tasks
-- Keep each bullet to 1-2 lines
-- NO buzzwords like "passionate", "driven", "results-oriented"
-- NO generic phrases like "responsible for", "worked on"
-
-SKILLS SECTION:
-- Keep ALL original skills
-- ADD new skills from candidate answers
-- Group by category: Languages | Frameworks | Databases | DevOps | Tools
-
-Return JSON with this EXACT structure:
-{
-    "cv": {
-        "personal_info": {
-            "name": "EXACT name from original",
-            "email": "EXACT email from original",
-            "phone": "EXACT phone from original",
-            "location": "EXACT location from original",
-            "linkedin": "EXACT linkedin from original"
-        },
-        "summary": "2-3 sentence professional summary tailored to job",
-        "experience": [
-            {
-                "company": "EXACT company name from original",
-                "title": "EXACT title from original",
-                "start_date": "EXACT start date from original",
-                "end_date": "EXACT end date from original",
-                "responsibilities": [],
-                "achievements": ["Improved bullet 1", "Improved bullet 2", ...]
-            }
-        ],
-        "education": [EXACT education from original],
-        "skills": ["Skill 1", "Skill 2", ...],
-        "certifications": [EXACT from original],
-        "languages": [EXACT from original]
-    },
-    "addressed_gap_ids": ["skill_1", "exp_2", ...],
-    "improvements_made": ["Rewrote X bullet to show impact", "Added Y skill from interview", ...]
-}"""
-
-    response = await client.chat.completions.create(
+    # Large CVs take a while to serialize; keep that off the event loop
+    # raw_text is the whole extracted CV again; the structured fields are what the model needs
+    original_json = await asyncio.to_thread(original_cv.model_dump_json, exclude={"raw_text"})
+    gaps_json = orjson.dumps(all_gaps).decode()
+    
+    response = await _chat_completion(
         model="gpt-4o",  # Using gpt-4o for better instruction following on this critical step
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _OPTIMIZE_CV_SYSTEM_PROMPT},
             {"role": "user", "content": f"""
 ORIGINAL CV (PRESERVE ALL DATA):
-{original_cv.model_dump_json()}
+{original_json}
 
 TARGET JOB DESCRIPTION:
 {job_description}
@@ -443,7 +680,7 @@ CANDIDATE'S INTERVIEW ANSWERS (use to enhance CV):
 {answered_info}
 
 GAPS TO ADDRESS:
-{json.dumps(all_gaps)}
+{gaps_json}
 
 IMPORTANT: 
 - Keep ALL {len(original_cv.experience)} jobs from the original
@@ -452,10 +689,12 @@ IMPORTANT:
 - Only IMPROVE bullet points and add information from answers"""}
         ],
         temperature=0.3,
+        max_tokens=_OPTIMIZE_CV_MAX_TOKENS,
+        seed=0,
         response_format={"type": "json_object"}
     )
     
-    result = json.loads(response.choices[0].message.content)
+    result = orjson.loads(response.choices[0].message.content)
     
     # Parse optimized CV
     cv_data = result.get("cv", result)
@@ -481,14 +720,16 @@ IMPORTANT:
         cv_data["personal_info"]["location"] = original_cv.personal_info.location
     
     # SAFETY CHECK: Ensure we didn't lose any jobs
-    original_companies = {exp.company.lower().strip() for exp in original_cv.experience}
-    optimized_companies = {exp.get("company", "").lower().strip() for exp in cv_data.get("experience", [])}
+    optimized_experience = cv_data.setdefault("experience", [])
     
     # If we lost jobs, add them back
-    if len(cv_data.get("experience", [])) < len(original_cv.experience):
-        for orig_exp in original_cv.experience:
-            if orig_exp.company.lower().strip() not in optimized_companies:
-                cv_data["experience"].append({
+    if len(optimized_experience) < len(original_cv.experience):
+        original_keys = [exp.company.lower().strip() for exp in original_cv.experience]
+        optimized_companies = {exp.get("company", "").lower().strip() for exp in optimized_experience}
+        missing = set(original_keys) - optimized_companies
+        for orig_exp, key in zip(original_cv.experience, original_keys):
+            if key in missing:
+                optimized_experience.append({
                     "company": orig_exp.company,
                     "title": orig_exp.title,
                     "start_date": orig_exp.start_date,
@@ -498,18 +739,22 @@ IMPORTANT:
                 })
     
     # SAFETY CHECK: Force original dates on all jobs (AI sometimes changes them)
-    for i, orig_exp in enumerate(original_cv.experience):
+    # Normalized company names are computed once; a matched entry's key is refreshed
+    # since its company is overwritten with the original name
+    optimized_keys = [exp.get("company", "").lower().strip() for exp in optimized_experience]
+    for orig_exp in original_cv.experience:
+        key = orig_exp.company.lower().strip()
         # Find matching job in optimized CV by company name
-        for opt_exp in cv_data.get("experience", []):
-            if orig_exp.company.lower().strip() in opt_exp.get("company", "").lower().strip() or \
-               opt_exp.get("company", "").lower().strip() in orig_exp.company.lower().strip():
-                opt_exp["start_date"] = orig_exp.start_date
-                opt_exp["end_date"] = orig_exp.end_date
-                opt_exp["company"] = orig_exp.company  # Keep exact company name
-                opt_exp["title"] = orig_exp.title  # Keep exact title
-                break
+        match = next((i for i, opt_key in enumerate(optimized_keys) if key in opt_key or opt_key in key), None)
+        if match is not None:
+            opt_exp = optimized_experience[match]
+            opt_exp["start_date"] = orig_exp.start_date
+            opt_exp["end_date"] = orig_exp.end_date
+            opt_exp["company"] = orig_exp.company  # Keep exact company name
+            opt_exp["title"] = orig_exp.title  # Keep exact title
+            optimized_keys[match] = key
     
-    optimized_cv = ParsedCV(**cv_data)
+    optimized_cv = _PARSED_CV_ADAPTER.validate_python(cv_data)
     
     # Build comparison
     addressed_ids = result.get("addressed_gap_ids", [])
@@ -541,13 +786,17 @@ IMPORTANT:
     return optimized_cv, comparison
 
 
-async def transcribe_audio(audio_bytes: bytes, filename: str) -> str:
-    """Transcribe audio using Whisper."""
+async def transcribe_audio(audio: bytes | BinaryIO, filename: str, content_type: str | None = None) -> str:
+    """Transcribe audio (raw bytes or a file-like object) using Whisper."""
+    # Passing the content type lets the SDK skip guessing it from the filename
+    file = (filename, audio, content_type) if content_type else (filename, audio)
     
-    response = await client.audio.transcriptions.create(
-        model="whisper-1",
-        file=(filename, audio_bytes),
-        response_format="text"
-    )
+    async with _OPENAI_SEM:
+        await _OPENAI_BUCKET.acquire()
+        response = await client.audio.transcriptions.create(
+            model="whisper-1",
+            file=file,
+            response_format="text"
+        )
     
     return response
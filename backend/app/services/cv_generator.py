@@ -12,20 +12,86 @@ Design principles:
 - Professional, not AI-generated feel
 """
 
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, PageBreak
-from reportlab.lib.colors import HexColor, black
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, Callable
 from app.models import ParsedCV
 import re
 
+if TYPE_CHECKING:
+    from docx.shared import Length, RGBColor
+    from reportlab.lib.styles import StyleSheet1
+
+# python-docx and ReportLab are imported on first use (_docx_kit / _pdf_kit): together
+# they add hundreds of ms to worker start-up, paid even by requests that never render
+# a CV. Each kit holds the imported names plus the constants built from them.
+
+
+# Skill categories for the skills section, in display (and matching priority) order
+_SKILL_CATEGORIES = {
+    "Languages": ["python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "ruby", "php", "swift", "kotlin", "scala", "r", "c/c++", "c", "perl", "bash", "shell"],
+    "Frontend": ["react", "vue", "angular", "next.js", "nuxt", "svelte", "html", "css", "tailwind", "bootstrap", "sass", "redux", "react native", "flutter", "material ui", "chakra"],
+    "Backend": ["node.js", "express", "django", "flask", "fastapi", "spring", "spring boot", ".net", "rails", "laravel", "nest.js", "express.js", "asp.net", "gin", "fiber"],
+    "Databases": ["postgresql", "mysql", "mongodb", "redis", "elasticsearch", "sqlite", "oracle", "sql server", "dynamodb", "cassandra", "firebase", "supabase", "neo4j", "mariadb"],
+    "DevOps & Cloud": ["aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "github actions", "gitlab", "ci/cd", "terraform", "ansible", "linux", "nginx", "apache", "cloudflare", "vercel", "heroku", "digitalocean"],
+    "Testing": ["jest", "pytest", "selenium", "cypress", "junit", "mocha", "testing", "unit testing", "integration testing", "e2e", "playwright", "vitest", "rspec"],
+    "AI/ML": ["tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "machine learning", "deep learning", "nlp", "computer vision", "keras", "opencv", "huggingface", "langchain", "openai"],
+    "Tools": ["git", "jira", "postman", "figma", "webpack", "vite", "npm", "yarn", "agile", "scrum", "rest", "graphql", "websockets", "swagger", "confluence", "slack", "notion"]
+}
+_CATEGORY_NAMES = list(_SKILL_CATEGORIES)
+_NO_CATEGORY = len(_CATEGORY_NAMES)
+
+# ReportLab paragraph markup escaping (one pass instead of chained replaces)
+_XML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+_TOKEN_RE = re.compile(r"[a-z0-9\+/#\.]+")
+
+# Keyword -> index of the first category listing it, split by how the keyword matches:
+# - any keyword matches a skill that equals it exactly
+# - short keywords (<=2 chars) match as a whole token ("r", "go", "c#")
+# - longer multi-word/punctuated keywords match as substrings ("react native", "node.js")
+# - everything else matches on word boundaries
+# The last two are compiled into one alternation per category, in category order, so a
+# skill costs one scan per category checked rather than one per keyword.
+_EXACT_LOOKUP: dict[str, int] = {}
+_TOKEN_LOOKUP: dict[str, int] = {}
+_FALLBACK_PATTERNS: list[tuple[int, re.Pattern]] = []
+
+for _index, _keywords in enumerate(_SKILL_CATEGORIES.values()):
+    _alternatives = []
+    for _kw in _keywords:
+        _kw = _kw.lower().strip()
+        if not _kw:
+            continue
+        _EXACT_LOOKUP.setdefault(_kw, _index)
+        if len(_kw) >= 4 and (" " in _kw or "." in _kw or "/" in _kw or "-" in _kw):
+            _alternatives.append(re.escape(_kw))
+        elif len(_kw) <= 2:
+            _TOKEN_LOOKUP.setdefault(_kw, _index)
+        else:
+            _alternatives.append(rf"\b{re.escape(_kw)}\b")
+    if _alternatives:
+        _FALLBACK_PATTERNS.append((_index, re.compile("|".join(_alternatives))))
+
+
+def _skill_category(skill_lower: str) -> str | None:
+    """Return the first category (in display order) with a keyword matching the skill."""
+    best = _EXACT_LOOKUP.get(skill_lower, _NO_CATEGORY)
+    if best:
+        for tok in _TOKEN_RE.findall(skill_lower):
+            best = min(best, _TOKEN_LOOKUP.get(tok, _NO_CATEGORY))
+        # Only categories before the best hit so far can change the result
+        for index, pattern in _FALLBACK_PATTERNS:
+            if index >= best:
+                break
+            if pattern.search(skill_lower):
+                best = index
+                break
+    return _CATEGORY_NAMES[best] if best < _NO_CATEGORY else None
+
 
 def format_skills_for_display(skills: list[str]) -> str:
     """
@@ -34,50 +100,24 @@ def format_skills_for_display(skills: list[str]) -> str:
     """
     if not skills:
         return ""
-    
-    # Define category keywords
-    categories = {
-        "Languages": ["python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "ruby", "php", "swift", "kotlin", "scala", "r", "c/c++", "c", "perl", "bash", "shell"],
-        "Frontend": ["react", "vue", "angular", "next.js", "nuxt", "svelte", "html", "css", "tailwind", "bootstrap", "sass", "redux", "react native", "flutter", "material ui", "chakra"],
-        "Backend": ["node.js", "express", "django", "flask", "fastapi", "spring", "spring boot", ".net", "rails", "laravel", "nest.js", "express.js", "asp.net", "gin", "fiber"],
-        "Databases": ["postgresql", "mysql", "mongodb", "redis", "elasticsearch", "sqlite", "oracle", "sql server", "dynamodb", "cassandra", "firebase", "supabase", "neo4j", "mariadb"],
-        "DevOps & Cloud": ["aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "github actions", "gitlab", "ci/cd", "terraform", "ansible", "linux", "nginx", "apache", "cloudflare", "vercel", "heroku", "digitalocean"],
-        "Testing": ["jest", "pytest", "selenium", "cypress", "junit", "mocha", "testing", "unit testing", "integration testing", "e2e", "playwright", "vitest", "rspec"],
-        "AI/ML": ["tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "machine learning", "deep learning", "nlp", "computer vision", "keras", "opencv", "huggingface", "langchain", "openai"],
-        "Tools": ["git", "jira", "postman", "figma", "webpack", "vite", "npm", "yarn", "agile", "scrum", "rest", "graphql", "websockets", "swagger", "confluence", "slack", "notion"]
-    }
-    
-    categorized = {cat: [] for cat in categories}
+    return _format_skills(tuple(skills))
+
+
+@lru_cache(maxsize=256)
+def _format_skills(skills: tuple[str, ...]) -> str:
+    # A single skill is one line whatever its category
+    present = [s for s in skills if s]
+    if len(present) <= 1:
+        return ", ".join(present)
+    
+    categorized = {cat: [] for cat in _CATEGORY_NAMES}
     uncategorized = []
     
-    def matches(skill_lower: str, kw: str) -> bool:
-        """Robust matching: avoid substring matches for very short keywords."""
-        kw_l = kw.lower().strip()
-        if not kw_l:
-            return False
-        # Exact match
-        if skill_lower == kw_l:
-            return True
-        # Multi-word keyword or contains punctuation -> allow substring match
-        if len(kw_l) >= 4 and (" " in kw_l or "." in kw_l or "/" in kw_l or "-" in kw_l):
-            return kw_l in skill_lower
-        # For short keywords (<=2), only match as a whole token
-        if len(kw_l) <= 2:
-            return any(tok == kw_l for tok in re.findall(r"[a-z0-9\+/#\.]+", skill_lower))
-        # Default: word-boundary match
-        return re.search(rf"\b{re.escape(kw_l)}\b", skill_lower) is not None
-
-    for skill in skills:
-        if not skill:
-            continue
-        skill_lower = skill.lower().strip()
-        found = False
-        for cat, keywords in categories.items():
-            if any(matches(skill_lower, kw) for kw in keywords):
-                categorized[cat].append(skill)
-                found = True
-                break
-        if not found:
+    for skill in present:
+        cat = _skill_category(skill.lower().strip())
+        if cat:
+            categorized[cat].append(skill)
+        else:
             uncategorized.append(skill)
     
     # Build output
@@ -91,12 +131,117 @@ def format_skills_for_display(skills: list[str]) -> str:
     
     # If categorization didn't work well, just return comma-separated
     if len(lines) <= 1:
-        return ", ".join([s for s in skills if s])
+        return ", ".join(present)
     
     return "\n".join(lines)
 
 
-def create_cv_docx(cv: ParsedCV) -> bytes:
+@dataclass
+class RenderedCV:
+    """Format-independent CV content, computed once and shared by the DOCX and PDF writers."""
+    contact_line: str
+    skill_lines: list[str]
+    # Per job: bullets to print (achievements first, first 6 non-empty)
+    bullets_per_job: list[list[str]]
+
+
+def prepare_cv_content(cv: ParsedCV) -> RenderedCV:
+    """Contact line, skill lines and job bullets for `cv`."""
+    info = cv.personal_info
+    # Clean LinkedIn URL
+    linkedin = info.linkedin and info.linkedin.removeprefix("https://").removeprefix("http://").removeprefix("www.")
+    contact_line = " • ".join(filter(None, (info.email, info.phone, info.location, linkedin)))
+    
+    # Format skills in a readable way with line breaks between categories
+    skill_lines = []
+    if cv.skills:
+        skill_lines = [line for line in format_skills_for_display(cv.skills).split('\n') if line.strip()]
+    
+    bullets_per_job = []
+    for exp in cv.experience:
+        # Bullet points (combine achievements and responsibilities)
+        achievements = exp.achievements or ()
+        responsibilities = exp.responsibilities or ()
+        clean_bullets = (b for b in chain(achievements, responsibilities) if b and b.strip())
+        bullets_per_job.append(list(islice(clean_bullets, 6)))  # Limit to 6 bullets per job
+    
+    return RenderedCV(contact_line, skill_lines, bullets_per_job)
+
+
+@dataclass(frozen=True)
+class _DocxKit:
+    """python-docx names and shared docx lengths/colours (value objects, never mutated)."""
+    Document: Callable[..., Any]
+    Inches: Callable[[float], "Length"]
+    WD_ALIGN_PARAGRAPH: Any
+    WD_STYLE_TYPE: Any
+    OxmlElement: Callable[[str], Any]
+    qn: Callable[[str], str]
+    pt_2: "Length"
+    pt_3: "Length"
+    pt_4: "Length"
+    pt_6: "Length"
+    pt_8: "Length"
+    pt_9: "Length"
+    pt_10: "Length"
+    pt_11: "Length"
+    pt_12: "Length"
+    pt_16: "Length"
+    black: "RGBColor"
+    grey_80: "RGBColor"
+    grey_100: "RGBColor"
+
+
+@lru_cache(maxsize=1)
+def _docx_kit() -> _DocxKit:
+    """Import python-docx (first call only; a racing duplicate build is harmless)."""
+    from docx import Document
+    from docx.shared import Pt, Inches, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    
+    return _DocxKit(
+        Document=Document, Inches=Inches, WD_ALIGN_PARAGRAPH=WD_ALIGN_PARAGRAPH,
+        WD_STYLE_TYPE=WD_STYLE_TYPE, OxmlElement=OxmlElement, qn=qn,
+        pt_2=Pt(2), pt_3=Pt(3), pt_4=Pt(4), pt_6=Pt(6), pt_8=Pt(8), pt_9=Pt(9),
+        pt_10=Pt(10), pt_11=Pt(11), pt_12=Pt(12), pt_16=Pt(16),
+        black=RGBColor(0, 0, 0), grey_80=RGBColor(80, 80, 80), grey_100=RGBColor(100, 100, 100),
+    )
+
+
+def _add_docx_styles(doc) -> None:
+    """Register the paragraph styles shared by the body text, so paragraphs just name one."""
+    dx = _docx_kit()
+    body = doc.styles.add_style("CVBody", dx.WD_STYLE_TYPE.PARAGRAPH)
+    body.base_style = doc.styles["Normal"]
+    body.font.size = dx.pt_10
+    
+    # Bullets keep Word's native "List Bullet" style (numbering + ATS friendliness); only its size and spacing change
+    bullet = doc.styles["List Bullet"]
+    bullet.font.size = dx.pt_10
+    bullet.paragraph_format.space_after = dx.pt_3
+    
+    header = doc.styles.add_style("CVSectionHeader", dx.WD_STYLE_TYPE.PARAGRAPH)
+    header.base_style = doc.styles["Normal"]
+    header.font.bold = True
+    header.font.size = dx.pt_11
+    header.font.color.rgb = dx.black
+    # Bottom border (a native paragraph border instead of a separator paragraph);
+    # added before the spacing so the pPr children stay in schema order
+    border = dx.OxmlElement("w:pBdr")
+    bottom = dx.OxmlElement("w:bottom")
+    bottom.set(dx.qn("w:val"), "single")
+    bottom.set(dx.qn("w:sz"), "4")
+    bottom.set(dx.qn("w:space"), "1")
+    bottom.set(dx.qn("w:color"), "B4B4B4")
+    border.append(bottom)
+    header.element.get_or_add_pPr().append(border)
+    header.paragraph_format.space_after = dx.pt_8
+
+
+def create_cv_docx_stream(cv: ParsedCV, rendered: RenderedCV | None = None) -> BytesIO:
     """
     Create a professional ATS-optimized DOCX CV.
     
@@ -105,15 +250,22 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
     - Professional typography
     - Consistent spacing
     - No graphics or tables
+    
+    Returns the document in a BytesIO positioned at the start, so callers that
+    stream or write it out skip the full-document bytes copy.
+    Pass `rendered` (from prepare_cv_content) when also building the PDF to share that work.
     """
-    doc = Document()
+    dx = _docx_kit()
+    rendered = rendered or prepare_cv_content(cv)
+    doc = dx.Document()
+    _add_docx_styles(doc)
     
     # Set narrow margins for more content space
     for section in doc.sections:
-        section.top_margin = Inches(0.6)
-        section.bottom_margin = Inches(0.6)
-        section.left_margin = Inches(0.7)
-        section.right_margin = Inches(0.7)
+        section.top_margin = dx.Inches(0.6)
+        section.bottom_margin = dx.Inches(0.6)
+        section.left_margin = dx.Inches(0.7)
+        section.right_margin = dx.Inches(0.7)
     
     # ─────────────────────────────────────────────────────────────
     # HEADER: Name & Contact
@@ -122,69 +274,37 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
         name_para = doc.add_paragraph()
         name_run = name_para.add_run(cv.personal_info.name.upper())
         name_run.bold = True
-        name_run.font.size = Pt(16)
-        name_run.font.color.rgb = RGBColor(0, 0, 0)
-        name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        name_para.space_after = Pt(4)
+        name_run.font.size = dx.pt_16
+        name_run.font.color.rgb = dx.black
+        name_para.alignment = dx.WD_ALIGN_PARAGRAPH.CENTER
+        name_para.space_after = dx.pt_4
     
     # Contact line
-    contact_parts = []
-    if cv.personal_info.email:
-        contact_parts.append(cv.personal_info.email)
-    if cv.personal_info.phone:
-        contact_parts.append(cv.personal_info.phone)
-    if cv.personal_info.location:
-        contact_parts.append(cv.personal_info.location)
-    if cv.personal_info.linkedin:
-        # Clean LinkedIn URL
-        linkedin = cv.personal_info.linkedin.replace("https://", "").replace("www.", "")
-        contact_parts.append(linkedin)
-    
-    if contact_parts:
+    if rendered.contact_line:
         contact_para = doc.add_paragraph()
-        contact_run = contact_para.add_run(" • ".join(contact_parts))
-        contact_run.font.size = Pt(10)
-        contact_run.font.color.rgb = RGBColor(80, 80, 80)
-        contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        contact_para.space_after = Pt(12)
+        contact_run = contact_para.add_run(rendered.contact_line)
+        contact_run.font.size = dx.pt_10
+        contact_run.font.color.rgb = dx.grey_80
+        contact_para.alignment = dx.WD_ALIGN_PARAGRAPH.CENTER
+        contact_para.space_after = dx.pt_12
     
     def add_section_header(title: str):
         """Add a clean section header with underline."""
-        para = doc.add_paragraph()
-        para.space_before = Pt(14)
-        para.space_after = Pt(6)
-        run = para.add_run(title.upper())
-        run.bold = True
-        run.font.size = Pt(11)
-        run.font.color.rgb = RGBColor(0, 0, 0)
-        # Add bottom border
-        para.paragraph_format.space_after = Pt(2)
-        
-        # Separator line
-        sep = doc.add_paragraph()
-        sep.paragraph_format.space_after = Pt(8)
-        sep_run = sep.add_run("-" * 80)
-        sep_run.font.size = Pt(6)
-        sep_run.font.color.rgb = RGBColor(180, 180, 180)
+        doc.add_paragraph(title.upper(), style="CVSectionHeader")
     
     def add_bullet_point(text: str):
         """Add a clean bullet point."""
         # Use Word's native bullet list style for better compatibility than a literal "•".
-        para = doc.add_paragraph(style="List Bullet")
-        para.paragraph_format.left_indent = Inches(0.2)
-        para.paragraph_format.space_after = Pt(3)
-        run = para.add_run(text)
-        run.font.size = Pt(10)
+        para = doc.add_paragraph(text, style="List Bullet")
+        para.paragraph_format.left_indent = dx.Inches(0.2)
     
     # ─────────────────────────────────────────────────────────────
     # PROFESSIONAL SUMMARY
     # ─────────────────────────────────────────────────────────────
     if cv.summary:
         add_section_header("Professional Summary")
-        summary_para = doc.add_paragraph()
-        summary_run = summary_para.add_run(cv.summary)
-        summary_run.font.size = Pt(10)
-        summary_para.paragraph_format.space_after = Pt(6)
+        summary_para = doc.add_paragraph(cv.summary, style="CVBody")
+        summary_para.paragraph_format.space_after = dx.pt_6
     
     # ─────────────────────────────────────────────────────────────
     # PROFESSIONAL EXPERIENCE
@@ -197,37 +317,29 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
             title_para = doc.add_paragraph()
             title_run = title_para.add_run(exp.title)
             title_run.bold = True
-            title_run.font.size = Pt(11)
+            title_run.font.size = dx.pt_11
             
             company_run = title_para.add_run(f" | {exp.company}")
-            company_run.font.size = Pt(11)
-            title_para.paragraph_format.space_after = Pt(2)
+            company_run.font.size = dx.pt_11
+            title_para.paragraph_format.space_after = dx.pt_2
             
             # Dates
             if exp.start_date or exp.end_date:
                 date_para = doc.add_paragraph()
                 date_text = f"{exp.start_date or ''} – {exp.end_date or 'Present'}"
                 date_run = date_para.add_run(date_text)
-                date_run.font.size = Pt(9)
-                date_run.font.color.rgb = RGBColor(100, 100, 100)
+                date_run.font.size = dx.pt_9
+                date_run.font.color.rgb = dx.grey_100
                 date_run.italic = True
-                date_para.paragraph_format.space_after = Pt(4)
+                date_para.paragraph_format.space_after = dx.pt_4
             
-            # Bullet points (combine responsibilities and achievements)
-            bullets = []
-            if exp.achievements:
-                bullets.extend(exp.achievements)
-            if exp.responsibilities:
-                bullets.extend(exp.responsibilities)
-            
-            for bullet in bullets[:6]:  # Limit to 6 bullets per job
-                if bullet and bullet.strip():
-                    add_bullet_point(bullet)
+            for bullet in rendered.bullets_per_job[i]:
+                add_bullet_point(bullet)
             
             # Space between jobs
             if i < len(cv.experience) - 1:
                 spacer = doc.add_paragraph()
-                spacer.paragraph_format.space_after = Pt(8)
+                spacer.paragraph_format.space_after = dx.pt_8
     
     # ─────────────────────────────────────────────────────────────
     # EDUCATION
@@ -236,7 +348,7 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
         add_section_header("Education")
         
         for edu in cv.education:
-            edu_para = doc.add_paragraph()
+            edu_para = doc.add_paragraph(style="CVBody")
             
             # Degree
             degree_text = edu.degree
@@ -244,33 +356,26 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
                 degree_text += f" in {edu.field}"
             degree_run = edu_para.add_run(degree_text)
             degree_run.bold = True
-            degree_run.font.size = Pt(10)
             
             # Institution
-            inst_run = edu_para.add_run(f" | {edu.institution}")
-            inst_run.font.size = Pt(10)
+            edu_para.add_run(f" | {edu.institution}")
             
             # Date
             if edu.graduation_date:
                 date_run = edu_para.add_run(f" ({edu.graduation_date})")
-                date_run.font.size = Pt(9)
-                date_run.font.color.rgb = RGBColor(100, 100, 100)
+                date_run.font.size = dx.pt_9
+                date_run.font.color.rgb = dx.grey_100
             
-            edu_para.paragraph_format.space_after = Pt(4)
+            edu_para.paragraph_format.space_after = dx.pt_4
     
     # ─────────────────────────────────────────────────────────────
     # SKILLS
     # ─────────────────────────────────────────────────────────────
     if cv.skills:
         add_section_header("Technical Skills")
-        # Format skills in a readable way with line breaks between categories
-        skills_text = format_skills_for_display(cv.skills)
-        for line in skills_text.split('\n'):
-            if line.strip():
-                skills_para = doc.add_paragraph()
-                skills_run = skills_para.add_run(line)
-                skills_run.font.size = Pt(10)
-                skills_para.paragraph_format.space_after = Pt(2)
+        for line in rendered.skill_lines:
+            skills_para = doc.add_paragraph(line, style="CVBody")
+            skills_para.paragraph_format.space_after = dx.pt_2
     
     # ─────────────────────────────────────────────────────────────
     # CERTIFICATIONS
@@ -286,38 +391,25 @@ def create_cv_docx(cv: ParsedCV) -> bytes:
     # ─────────────────────────────────────────────────────────────
     if cv.languages:
         add_section_header("Languages")
-        langs_para = doc.add_paragraph()
         langs_text = " • ".join([l for l in cv.languages if l])
-        langs_run = langs_para.add_run(langs_text)
-        langs_run.font.size = Pt(10)
+        doc.add_paragraph(langs_text, style="CVBody")
     
-    # Save to bytes
     buffer = BytesIO()
     doc.save(buffer)
     buffer.seek(0)
-    return buffer.getvalue()
+    return buffer
 
 
-def create_cv_pdf(cv: ParsedCV) -> bytes:
-    """
-    Create a professional ATS-optimized PDF CV.
-    
-    Features:
-    - Clean single-column layout
-    - Professional typography (no fancy fonts)
-    - Consistent spacing
-    - No graphics, icons, or colors
-    - Optimized for ATS parsing
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=A4, 
-        topMargin=0.5*inch, 
-        bottomMargin=0.5*inch, 
-        leftMargin=0.6*inch, 
-        rightMargin=0.6*inch
-    )
+def create_cv_docx(cv: ParsedCV, rendered: RenderedCV | None = None) -> bytes:
+    """DOCX CV as bytes (for uploads, which need the whole document anyway)."""
+    return create_cv_docx_stream(cv, rendered).getvalue()
+
+
+def _build_pdf_styles() -> "StyleSheet1":
+    """Sample stylesheet plus the CV paragraph styles (input-independent, built once)."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import HexColor, black
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
     
     styles = getSampleStyleSheet()
     
@@ -355,15 +447,6 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         textColor=black
     ))
     
-    # Section separator
-    styles.add(ParagraphStyle(
-        name='CVSeparator',
-        fontName='Helvetica',
-        fontSize=6,
-        textColor=HexColor('#b4b4b4'),
-        spaceAfter=8
-    ))
-    
     # Job title - bold
     styles.add(ParagraphStyle(
         name='CVJobTitle',
@@ -382,12 +465,13 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         spaceAfter=4
     ))
     
-    # Bullet point
+    # Bullet point (bullet drawn by ReportLab via bulletText, wrapped lines hang under the text)
     styles.add(ParagraphStyle(
         name='CVBullet',
         fontName='Helvetica',
         fontSize=10,
-        leftIndent=12,
+        bulletIndent=12,
+        leftIndent=18,
         spaceAfter=3,
         textColor=black
     ))
@@ -410,6 +494,70 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         spaceAfter=6,
         textColor=black
     ))
+    return styles
+
+
+@dataclass(frozen=True)
+class _PdfKit:
+    """ReportLab names plus the shared PDF styles (read-only during rendering)."""
+    A4: tuple[float, float]
+    inch: float
+    HexColor: Callable[[str], Any]
+    SimpleDocTemplate: Callable[..., Any]
+    Paragraph: Callable[..., Any]
+    Spacer: Callable[..., Any]
+    KeepTogether: Callable[..., Any]
+    CondPageBreak: Callable[..., Any]
+    HRFlowable: Callable[..., Any]
+    styles: "StyleSheet1"
+    # Room needed to start a job entry: title, date and about two bullets (a bullet line is ~15pt)
+    job_keep_height: float
+
+
+@lru_cache(maxsize=1)
+def _pdf_kit() -> _PdfKit:
+    """Import ReportLab and build the shared PDF styles (first call only)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, CondPageBreak
+    from reportlab.platypus.flowables import HRFlowable
+    from reportlab.lib.colors import HexColor
+    
+    return _PdfKit(
+        A4=A4, inch=inch, HexColor=HexColor, SimpleDocTemplate=SimpleDocTemplate,
+        Paragraph=Paragraph, Spacer=Spacer, KeepTogether=KeepTogether,
+        CondPageBreak=CondPageBreak, HRFlowable=HRFlowable,
+        styles=_build_pdf_styles(), job_keep_height=1.2 * inch,
+    )
+
+
+def create_cv_pdf_stream(cv: ParsedCV, rendered: RenderedCV | None = None) -> BytesIO:
+    """
+    Create a professional ATS-optimized PDF CV.
+    
+    Features:
+    - Clean single-column layout
+    - Professional typography (no fancy fonts)
+    - Consistent spacing
+    - No graphics, icons, or colors
+    - Optimized for ATS parsing
+    
+    Returns the document in a BytesIO positioned at the start (see create_cv_docx_stream).
+    Pass `rendered` (from prepare_cv_content) when also building the DOCX to share that work.
+    """
+    rl = _pdf_kit()
+    rendered = rendered or prepare_cv_content(cv)
+    buffer = BytesIO()
+    doc = rl.SimpleDocTemplate(
+        buffer, 
+        pagesize=rl.A4, 
+        topMargin=0.5*rl.inch, 
+        bottomMargin=0.5*rl.inch, 
+        leftMargin=0.6*rl.inch, 
+        rightMargin=0.6*rl.inch
+    )
+    
+    styles = rl.styles
     
     story = []
     
@@ -417,39 +565,28 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         """Escape XML special characters."""
         if not text:
             return ""
-        return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        return str(text).translate(_XML_ESCAPE)
     
     def add_section(title: str):
         """Add a section header with separator."""
-        story.append(Paragraph(title.upper(), styles['CVSection']))
-        story.append(Paragraph("-" * 95, styles['CVSeparator']))
+        story.append(rl.Paragraph(title.upper(), styles['CVSection']))
+        story.append(rl.HRFlowable(width="100%", thickness=0.4, color=rl.HexColor('#b4b4b4'), spaceBefore=2, spaceAfter=8))
     
     # ─────────────────────────────────────────────────────────────
     # HEADER
     # ─────────────────────────────────────────────────────────────
     if cv.personal_info.name:
-        story.append(Paragraph(safe_text(cv.personal_info.name.upper()), styles['CVName']))
-    
-    contact_parts = []
-    if cv.personal_info.email:
-        contact_parts.append(cv.personal_info.email)
-    if cv.personal_info.phone:
-        contact_parts.append(cv.personal_info.phone)
-    if cv.personal_info.location:
-        contact_parts.append(cv.personal_info.location)
-    if cv.personal_info.linkedin:
-        linkedin = cv.personal_info.linkedin.replace("https://", "").replace("www.", "")
-        contact_parts.append(linkedin)
-    
-    if contact_parts:
-        story.append(Paragraph(safe_text(" • ".join(contact_parts)), styles['CVContact']))
+        story.append(rl.Paragraph(safe_text(cv.personal_info.name.upper()), styles['CVName']))
+    
+    if rendered.contact_line:
+        story.append(rl.Paragraph(safe_text(rendered.contact_line), styles['CVContact']))
     
     # ─────────────────────────────────────────────────────────────
     # PROFESSIONAL SUMMARY
     # ─────────────────────────────────────────────────────────────
     if cv.summary:
         add_section("Professional Summary")
-        story.append(Paragraph(safe_text(cv.summary), styles['CVText']))
+        story.append(rl.Paragraph(safe_text(cv.summary), styles['CVText']))
     
     # ─────────────────────────────────────────────────────────────
     # PROFESSIONAL EXPERIENCE
@@ -458,42 +595,26 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         add_section("Professional Experience")
         
         for i, exp in enumerate(cv.experience):
-            # Group each job entry together to prevent awkward page breaks
-            job_elements = []
+            # Start the job on a new page unless its title, date and first bullets
+            # fit here (a fixed check, cheaper than KeepTogether's trial layouts)
+            story.append(rl.CondPageBreak(rl.job_keep_height))
             
             # Title and company
             title_text = f"<b>{safe_text(exp.title)}</b> | {safe_text(exp.company)}"
-            job_elements.append(Paragraph(title_text, styles['CVJobTitle']))
+            story.append(rl.Paragraph(title_text, styles['CVJobTitle']))
             
             # Dates
             if exp.start_date or exp.end_date:
                 date_text = f"{exp.start_date or ''} – {exp.end_date or 'Present'}"
-                job_elements.append(Paragraph(safe_text(date_text), styles['CVDate']))
+                story.append(rl.Paragraph(safe_text(date_text), styles['CVDate']))
             
             # Bullets (achievements first, then responsibilities)
-            bullets = []
-            if exp.achievements:
-                bullets.extend(exp.achievements)
-            if exp.responsibilities:
-                bullets.extend(exp.responsibilities)
-            
-            for bullet in bullets[:6]:
-                if bullet and bullet.strip():
-                    job_elements.append(Paragraph(f"• {safe_text(bullet)}", styles['CVBullet']))
-            
-            # Use KeepTogether to prevent job entries from being split across pages
-            # But only if the job has 4 or fewer bullets (otherwise it might be too long)
-            if len(bullets) <= 4:
-                story.append(KeepTogether(job_elements))
-            else:
-                # For longer entries, keep at least title + date + first 2 bullets together
-                story.append(KeepTogether(job_elements[:4]))
-                for elem in job_elements[4:]:
-                    story.append(elem)
+            for bullet in rendered.bullets_per_job[i]:
+                story.append(rl.Paragraph(safe_text(bullet), styles['CVBullet'], bulletText="•"))
             
             # Space between jobs
             if i < len(cv.experience) - 1:
-                story.append(Spacer(1, 10))
+                story.append(rl.Spacer(1, 10))
     
     # ─────────────────────────────────────────────────────────────
     # EDUCATION
@@ -511,11 +632,11 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
             if edu.graduation_date:
                 edu_text += f" ({safe_text(edu.graduation_date)})"
             
-            edu_elements.append(Paragraph(edu_text, styles['CVText']))
+            edu_elements.append(rl.Paragraph(edu_text, styles['CVText']))
         
         # Keep all education entries together if possible
         if len(edu_elements) <= 3:
-            story.append(KeepTogether(edu_elements))
+            story.append(rl.KeepTogether(edu_elements))
         else:
             for elem in edu_elements:
                 story.append(elem)
@@ -525,11 +646,8 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
     # ─────────────────────────────────────────────────────────────
     if cv.skills:
         add_section("Technical Skills")
-        # Format skills with categories
-        skills_formatted = format_skills_for_display(cv.skills)
-        for line in skills_formatted.split('\n'):
-            if line.strip():
-                story.append(Paragraph(safe_text(line), styles['CVSkills']))
+        for line in rendered.skill_lines:
+            story.append(rl.Paragraph(safe_text(line), styles['CVSkills']))
     
     # ─────────────────────────────────────────────────────────────
     # CERTIFICATIONS
@@ -538,7 +656,7 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
         add_section("Certifications")
         for cert in cv.certifications:
             if cert and cert.strip():
-                story.append(Paragraph(f"• {safe_text(cert)}", styles['CVBullet']))
+                story.append(rl.Paragraph(safe_text(cert), styles['CVBullet'], bulletText="•"))
     
     # ─────────────────────────────────────────────────────────────
     # LANGUAGES
@@ -546,8 +664,27 @@ def create_cv_pdf(cv: ParsedCV) -> bytes:
     if cv.languages:
         add_section("Languages")
         langs_text = " • ".join([safe_text(l) for l in cv.languages if l])
-        story.append(Paragraph(langs_text, styles['CVSkills']))
+        story.append(rl.Paragraph(langs_text, styles['CVSkills']))
     
     doc.build(story)
     buffer.seek(0)
-    return buffer.getvalue()
+    return buffer
+
+
+def create_cv_pdf(cv: ParsedCV, rendered: RenderedCV | None = None) -> bytes:
+    """PDF CV as bytes (for uploads, which need the whole document anyway)."""
+    return create_cv_pdf_stream(cv, rendered).getvalue()
+
+
+def create_cvs_bulk(cvs: list[ParsedCV], fmt: str = "pdf", max_workers: int | None = None) -> list[bytes]:
+    """
+    Render many CVs (in order) across a process pool, for offline bulk jobs.
+    Rendering is CPU-bound pure Python, so threads would serialize on the GIL;
+    each worker process imports this module once and renders its share.
+    Not for request handlers: starting the pool costs far more than one CV.
+    """
+    if fmt not in ("pdf", "docx"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    create = create_cv_pdf if fmt == "pdf" else create_cv_docx
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(create, cvs, chunksize=4))
@@ -1,8 +1,76 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from pypdf import PdfReader
 import pdfplumber
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LTChar, LTContainer
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from pdfminer.psparser import LIT
+from pdfminer.utils import decode_text
 from io import BytesIO
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import BinaryIO
 import re
-from statistics import median
+
+# Extracted text by PDF content hash -> (stored_at, text), oldest first (extraction runs
+# in worker threads). Entries are CV text, so they only live long enough to serve a re-upload
+_EXTRACT_CACHE_SIZE = 64
+_EXTRACT_CACHE_TTL_SECONDS = 600
+_extract_cache: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+_extract_lock = threading.Lock()
+
+# Extraction cleanup patterns, compiled once (they run on every line of every CV)
+_RE_SPACED_LETTERS = re.compile(r"(?:\b[A-Za-z0-9]\b\s+){6,}\b[A-Za-z0-9]\b")
+_RE_WS_ALL = re.compile(r"\s+")
+_RE_URL_SCHEME = re.compile(r"^https?:/{1,2}", re.I)
+_RE_AT = re.compile(r"\s*@\s*")
+_RE_DOT_WORD = re.compile(r"(?<=\w)\s*\.\s*(?=\w)")
+_RE_MULTI_WS = re.compile(r"[ \t]{2,}")
+_RE_DOT_UPPER = re.compile(r"\.(?=[A-Z])")
+_RE_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_RE_DIGIT_ALPHA = re.compile(r"(?<=\d)(?=[A-Za-z])")
+_RE_COLON = re.compile(r":(?=\w)")
+_RE_HYPHEN = re.compile(r"(?<=\w)\s*-\s*(?=\w)")
+_RE_ENDASH = re.compile(r"\s*–\s*")
+_RE_BLANK_LINES = re.compile(r"\n{3,}")
+_RE_SPACE_BEFORE_PUNCT = re.compile(r"\s+([.,/–—-])")
+_RE_SPACE_AFTER_OPEN = re.compile(r"([(/])\s+")
+_RE_WS_RUN = re.compile(r"\s{2,}")
+
+# Char-geometry line reconstruction: row sort/group keys, and punctuation that never
+# gets a space before / after it even across a wide gap
+_LINE_ORDER = itemgetter(0, 1)
+_LINE_KEY = itemgetter(0)
+_NO_SPACE_BEFORE = frozenset({".", ",", ":", ";", "/", ")", "]", "}", "-", "–", "—"})
+_NO_SPACE_AFTER = frozenset({"(", "[", "{", "/", "-", "–", "—", "@", "."})
+
+# Common split brand/tech tokens seen in Canva exports, fixed in one pass per line
+_TOKEN_FIXES = {
+    "Bachelorof": "Bachelor of",
+    "Masterin": "Master in",
+    "Facultyof": "Faculty of",
+    "Sciencesof": "Sciences of",
+    "Saa S": "SaaS",
+    "Mongo DB": "MongoDB",
+    "Open AI": "OpenAI",
+    "Type Script": "TypeScript",
+    "Web Sockets": "WebSockets",
+    "Gmb H": "GmbH",
+    "Open AIAPI": "OpenAI API",
+}
+# Longest first, so "Open AIAPI" wins over its prefix "Open AI"
+_RE_TOKEN_FIX = re.compile("|".join(re.escape(k) for k in sorted(_TOKEN_FIXES, key=len, reverse=True)))
+
+
+# Non-empty lines inspected by _looks_like_spaced_letters
+_SPACED_CHECK_LINES = 60
 
 
 def _looks_like_spaced_letters(text: str) -> bool:
@@ -12,97 +80,142 @@ def _looks_like_spaced_letters(text: str) -> bool:
     """
     if not text or len(text) < 200:
         return False
-    # Count lines that contain long runs of single-letter tokens
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    # Count lines that contain long runs of single-letter tokens (only the first
+    # _SPACED_CHECK_LINES non-empty lines are checked, so only those get stripped)
+    lines = list(islice((ln for ln in map(str.strip, text.splitlines()) if ln), _SPACED_CHECK_LINES))
     if not lines:
         return False
-    spaced_lines = 0
-    checked = 0
-    pattern = re.compile(r"(?:\b[A-Za-z0-9]\b\s+){6,}\b[A-Za-z0-9]\b")
-    for ln in lines[:60]:
-        checked += 1
-        if pattern.search(ln):
-            spaced_lines += 1
+    checked = len(lines)
+    spaced_lines = sum(1 for ln in lines if _RE_SPACED_LETTERS.search(ln))
     # If many early lines are like this, treat extraction as low-quality
     return checked >= 10 and (spaced_lines / checked) >= 0.2
 
 
-def _extract_text_pdfplumber_chars(pdf_bytes: bytes) -> str:
+def _open_stream(pdf: bytes | BinaryIO) -> BinaryIO:
+    """Return a readable stream positioned at the start of the PDF."""
+    if isinstance(pdf, (bytes, bytearray)):
+        return BytesIO(pdf)
+    pdf.seek(0)
+    return pdf
+
+
+def _median(values: list[float]) -> float:
+    """Median of a non-empty list (statistics.median without its type checks)."""
+    s = sorted(values)
+    mid = len(s) // 2
+    return s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) / 2
+
+
+def _space_threshold(gaps: list[float]) -> float:
+    """
+    Gap above which two chars on a line belong to different words.
+    Canva often uses very small inter-letter gaps (~0.2) and larger word gaps (~2-3).
+    We detect this by splitting gaps into "small" and "large" bands.
+    """
+    pos = [g for g in gaps if 0.05 < g < 50.0]  # ignore zeros and huge jumps (columns)
+    small = [g for g in pos if g <= 0.8]
+    large = [g for g in pos if g >= 1.6]
+    if small and large:
+        return (max(small) + min(large)) / 2.0
+    if pos:
+        return max(1.0, _median(pos) * 1.5)
+    return 4.0
+
+
+def _iter_chars(items):
+    """LTChars of a page layout, including those nested in figures (form XObjects)."""
+    for item in items:
+        if isinstance(item, LTChar):
+            yield item
+        elif isinstance(item, LTContainer):
+            yield from _iter_chars(item)
+
+
+def _process_page(page: PDFPage, layout) -> list[str]:
+    """Text lines of one page, rebuilt from the char boxes of its pdfminer layout."""
+    lines_out: list[str] = []
+
+    # Distance from the top of the page, as pdfplumber measures it ("top"):
+    # page height minus y1, shifted by the MediaBox origin
+    xs = sorted((page.mediabox[0], page.mediabox[2]))
+    ys = sorted((page.mediabox[1], page.mediabox[3]))
+    if page.rotate in (90, 270):
+        xs, ys = ys, xs
+    page_top = ys[1] - 2 * ys[0]
+
+    # One (line key, x0, x1, text) row per visible char, sorted once into
+    # lines (top to bottom) and left-to-right within each line.
+    # Lines group chars by "top", rounded to reduce jitter (3pt vertical tolerance).
+    rows = []
+    for ch in _iter_chars(layout):
+        txt = ch.get_text()
+        if not txt or not txt.strip():
+            continue
+        rows.append((int(round((page_top - ch.y1) / 3.0)), ch.x0, ch.x1, txt))
+    rows.sort(key=_LINE_ORDER)
+
+    for _, group in groupby(rows, key=_LINE_KEY):
+        line_chars = list(group)
+        gaps = [max(0.0, cur[1] - prev[2]) for prev, cur in zip(line_chars, line_chars[1:])]
+        space_threshold = _space_threshold(gaps)
+
+        buf = [line_chars[0][3]]
+        for gap, prev, cur in zip(gaps, line_chars, line_chars[1:]):
+            # Don't insert spaces around punctuation even if gap is large.
+            if gap > space_threshold and cur[3] not in _NO_SPACE_BEFORE and prev[3] not in _NO_SPACE_AFTER:
+                buf.append(" ")
+            buf.append(cur[3])
+
+        line = "".join(buf).strip()
+        if line:
+            lines_out.append(line)
+
+    return lines_out
+
+
+_LIT_URI = LIT("URI")
+
+
+def _page_uris(page: PDFPage) -> list[str]:
+    """Link targets of the page's URI annotations (Canva often stores LinkedIn etc. only there)."""
+    uris: list[str] = []
+    try:
+        for annot in resolve1(page.annots) or []:
+            action = resolve1(resolve1(annot).get("A"))
+            if isinstance(action, dict) and action.get("S") is _LIT_URI:
+                uri = resolve1(action.get("URI"))
+                if uri:
+                    uris.append(decode_text(uri) if isinstance(uri, bytes) else str(uri))
+    except Exception:
+        pass
+    return uris
+
+
+def _extract_text_from_chars(pdf: bytes | BinaryIO) -> tuple[str, list[str]]:
     """
     Canva PDFs often place text as individually positioned characters.
-    pdfplumber provides character boxes; we can reconstruct lines by geometry.
+    pdfminer provides character boxes; we can reconstruct lines by geometry.
+    Reads pdfminer's LTChar objects directly: pdfplumber's page.chars would build a
+    ~20-key dict per char just for the four values used here.
+    Pages are processed in order on the calling thread: pdfminer is pure Python (it
+    holds the GIL) and its parser reads one shared stream, so threads would not help.
+    Returns the text and the first page's link URIs, read from the same parsed document.
     """
     lines_out: list[str] = []
+    uris: list[str] = []
 
-    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            chars = page.chars or []
-            if not chars:
-                continue
-
-            # Group chars into lines by "top" coordinate.
-            # We bucket by rounding the top value to reduce jitter.
-            buckets: dict[int, list[dict]] = {}
-            for ch in chars:
-                txt = ch.get("text", "")
-                if not txt or not txt.strip():
-                    continue
-                top = ch.get("top", 0.0)
-                key = int(round(top / 3.0))  # 3pt vertical tolerance
-                buckets.setdefault(key, []).append(ch)
-
-            for _, line_chars in sorted(buckets.items(), key=lambda kv: kv[0]):
-                # Sort chars left-to-right
-                line_chars.sort(key=lambda c: c.get("x0", 0.0))
-
-                # Compute typical gap between consecutive chars
-                gaps: list[float] = []
-                prev_x1 = None
-                for c in line_chars:
-                    x0 = float(c.get("x0", 0.0))
-                    if prev_x1 is not None:
-                        gaps.append(max(0.0, x0 - prev_x1))
-                    prev_x1 = float(c.get("x1", x0))
-
-                # Space threshold:
-                # Canva often uses very small inter-letter gaps (~0.2) and larger word gaps (~2-3).
-                # We detect this by splitting gaps into "small" and "large" bands.
-                pos = [g for g in gaps if 0.05 < g < 50.0]  # ignore zeros and huge jumps (columns)
-                small = [g for g in pos if g <= 0.8]
-                large = [g for g in pos if g >= 1.6]
-                if small and large:
-                    space_threshold = (max(small) + min(large)) / 2.0
-                elif pos:
-                    space_threshold = max(1.0, median(pos) * 1.5)
-                else:
-                    space_threshold = 4.0
-
-                buf: list[str] = []
-                prev = None
-                for c in line_chars:
-                    ch = c.get("text", "")
-                    x0 = float(c.get("x0", 0.0))
-                    if prev is not None:
-                        gap = max(0.0, x0 - float(prev.get("x1", prev.get("x0", 0.0))))
-                        prev_ch = prev.get("text", "")
-
-                        # Don't insert spaces around punctuation even if gap is large.
-                        if gap > space_threshold:
-                            if ch in {".", ",", ":", ";", "/", ")", "]", "}", "-", "–", "—"}:
-                                pass
-                            elif prev_ch in {"(", "[", "{", "/", "-", "–", "—", "@", "."}:
-                                pass
-                            else:
-                                buf.append(" ")
-
-                    buf.append(ch)
-                    prev = c
-
-                line = "".join(buf).strip()
-                if line:
-                    lines_out.append(line)
-
-    return "\n".join(lines_out)
+    document = PDFDocument(PDFParser(_open_stream(pdf)), password="")
+    rsrcmgr = PDFResourceManager()
+    device = PDFPageAggregator(rsrcmgr, laparams=None)  # no layout analysis: raw chars only
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    for page_number, page in enumerate(PDFPage.create_pages(document)):
+        if page_number == 0:
+            uris = _page_uris(page)
+        interpreter.process_page(page)
+        lines_out.extend(_process_page(page, device.get_result()))
+
+    return "\n".join(lines_out), uris
 
 
 def _fix_common_tokens(text: str) -> str:
@@ -123,54 +236,40 @@ def _fix_common_tokens(text: str) -> str:
         # URL lines (Canva often stores LinkedIn as a clickable annotation)
         if "http" in lower or "www." in lower or "linkedin.com" in lower:
             # Remove all spaces in URLs to avoid corrupting them (e.g., "amine - abbassi").
-            line = re.sub(r"\s+", "", line)
+            line = _RE_WS_ALL.sub("", line)
             # Fix common URL tokenization
-            line = re.sub(r"^https?:/{1,2}", "https://", line, flags=re.I)
+            line = _RE_URL_SCHEME.sub("https://", line)
             out_lines.append(line)
             continue
 
         # Email-ish lines: preserve spaces elsewhere, but fix around @ and dots.
         if "@" in line:
-            line = re.sub(r"\s*@\s*", "@", line)
-            line = re.sub(r"(?<=\w)\s*\.\s*(?=\w)", ".", line)
-            out_lines.append(re.sub(r"[ \t]{2,}", " ", line).strip())
+            line = _RE_AT.sub("@", line)
+            line = _RE_DOT_WORD.sub(".", line)
+            out_lines.append(_RE_MULTI_WS.sub(" ", line).strip())
             continue
 
         # General text cleanup
         # 1) Insert space after sentence dots if missing: "word.Next" -> "word. Next"
-        line = re.sub(r"\.(?=[A-Z])", ". ", line)
+        line = _RE_DOT_UPPER.sub(". ", line)
         # 2) Insert spaces on camelCase / TitleCase boundaries: "BachelorofComputerScience" -> "Bachelorof Computer Science"
-        line = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", line)
+        line = _RE_CAMEL.sub(" ", line)
         # 2b) Insert space between digits and letters: "25Taher" -> "25 Taher"
-        line = re.sub(r"(?<=\d)(?=[A-Za-z])", " ", line)
+        line = _RE_DIGIT_ALPHA.sub(" ", line)
         # 3) Ensure space after ":" when missing
-        line = re.sub(r":(?=\w)", ": ", line)
+        line = _RE_COLON.sub(": ", line)
         # 4) Hyphens: keep hyphenated words as "cross-platform" (no spaces)
-        line = re.sub(r"(?<=\w)\s*-\s*(?=\w)", "-", line)
+        line = _RE_HYPHEN.sub("-", line)
         # 5) En-dash as separator
-        line = re.sub(r"\s*–\s*", " – ", line)
+        line = _RE_ENDASH.sub(" – ", line)
         # 6) Fix common split brand/tech tokens seen in Canva exports
-        token_fixes = {
-            "Bachelorof": "Bachelor of",
-            "Masterin": "Master in",
-            "Facultyof": "Faculty of",
-            "Sciencesof": "Sciences of",
-            "Saa S": "SaaS",
-            "Mongo DB": "MongoDB",
-            "Open AI": "OpenAI",
-            "Type Script": "TypeScript",
-            "Web Sockets": "WebSockets",
-            "Gmb H": "GmbH",
-            "Open AIAPI": "OpenAI API",
-        }
-        for bad, good in token_fixes.items():
-            line = line.replace(bad, good)
+        line = _RE_TOKEN_FIX.sub(lambda m: _TOKEN_FIXES[m.group(0)], line)
         # Collapse whitespace
-        line = re.sub(r"[ \t]{2,}", " ", line).strip()
+        line = _RE_MULTI_WS.sub(" ", line).strip()
         out_lines.append(line)
 
     out = "\n".join(out_lines)
-    out = re.sub(r"\n{3,}", "\n\n", out)
+    out = _RE_BLANK_LINES.sub("\n\n", out)
     return out.strip()
 
 
@@ -186,28 +285,79 @@ def _normalize_extracted_text(text: str) -> str:
     text = text.replace("�", "")  # unknown replacement char
 
     # Mild normalization only; spaced-letter Canva cases are handled earlier via char reconstruction.
-    text = re.sub(r"\s+([.,/–—-])", r"\1", text)
-    text = re.sub(r"([(/])\s+", r"\1", text)
-    text = re.sub(r"\s{2,}", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _RE_SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = _RE_SPACE_AFTER_OPEN.sub(r"\1", text)
+    text = _RE_WS_RUN.sub(" ", text)
+    text = _RE_BLANK_LINES.sub("\n\n", text)
     return _fix_common_tokens(text.strip())
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    """Extract text from PDF using pypdf with pdfplumber fallback."""
+def _content_key(pdf: bytes | BinaryIO) -> bytes:
+    """Short content hash of the PDF (cache key; not security-sensitive)."""
+    if isinstance(pdf, (bytes, bytearray)):
+        return hashlib.blake2b(pdf, digest_size=16).digest()
+    return hashlib.file_digest(_open_stream(pdf), lambda: hashlib.blake2b(digest_size=16)).digest()
+
+
+def extract_text_from_pdf(pdf: bytes | BinaryIO) -> str:
+    """
+    Extract text from PDF using pypdf with pdfplumber fallback.
+    Accepts raw bytes or a seekable file-like object (e.g. an upload's spooled file).
+    Results are cached by content for a few minutes, so re-uploading the same file skips extraction.
+    """
+    key = _content_key(pdf)
+    with _extract_lock:
+        _drop_stale_extracts()
+        entry = _extract_cache.get(key)
+        if entry is not None:
+            return entry[1]
+    
+    text = _extract_text(pdf)
+    with _extract_lock:
+        _extract_cache[key] = (time.monotonic(), text)
+        _extract_cache.move_to_end(key)
+        _drop_stale_extracts()
+    return text
+
+
+def _drop_stale_extracts() -> None:
+    """Evict expired and surplus cache entries (caller holds _extract_lock)."""
+    cutoff = time.monotonic() - _EXTRACT_CACHE_TTL_SECONDS
+    while _extract_cache:
+        stored_at, _ = next(iter(_extract_cache.values()))
+        if len(_extract_cache) <= _EXTRACT_CACHE_SIZE and stored_at >= cutoff:
+            break
+        _extract_cache.popitem(last=False)
+
+
+def _extract_text(pdf: bytes | BinaryIO) -> str:
+    # One stream for every pass; each pass rewinds it via _open_stream
+    pdf = _open_stream(pdf)
     text = ""
     
     # Try pypdf first (pure Python, no compilation needed)
     try:
-        reader = PdfReader(BytesIO(pdf_bytes))
+        reader = PdfReader(_open_stream(pdf))
+        spaced = None  # "spaced letters" verdict, once the pages read so far settle it
+        line_count = 0
         for page in reader.pages:
             page_text = page.extract_text()
             if page_text:
                 text += page_text + "\n"
+                # The verdict depends only on the first _SPACED_CHECK_LINES non-empty
+                # lines, so garbage output stops reading pages as soon as those are in
+                if spaced is None:
+                    line_count += sum(1 for ln in page_text.splitlines() if ln.strip())
+                    if line_count >= _SPACED_CHECK_LINES and len(text.strip()) >= 200:
+                        spaced = _looks_like_spaced_letters(text.strip())
+                        if spaced:
+                            break
         if text.strip():
             candidate = text.strip()
             # If extraction is "spaced letters" garbage, fall back to pdfplumber.
-            if not _looks_like_spaced_letters(candidate):
+            if spaced is None:
+                spaced = _looks_like_spaced_letters(candidate)
+            if not spaced:
                 return _normalize_extracted_text(candidate)
     except Exception:
         pass
@@ -215,28 +365,16 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
     # Fallback to pdfplumber.
     # For Canva-like PDFs, reconstruct from character geometry for much better results.
     try:
-        reconstructed = _extract_text_pdfplumber_chars(pdf_bytes)
+        reconstructed, uris = _extract_text_from_chars(pdf)
         if reconstructed and reconstructed.strip():
-            # Also try to capture hyperlinks (e.g., LinkedIn) which Canva often stores as annotations.
-            try:
-                reader = PdfReader(BytesIO(pdf_bytes))
-                page0 = reader.pages[0]
-                annots = page0.get("/Annots") or []
-                uris: list[str] = []
-                for a in annots:
-                    obj = a.get_object()
-                    act = obj.get("/A")
-                    if act and act.get("/S") == "/URI" and act.get("/URI"):
-                        uris.append(str(act.get("/URI")))
-                if uris:
-                    reconstructed = reconstructed + "\n" + "\n".join(uris)
-            except Exception:
-                pass
+            # Also capture hyperlinks (e.g., LinkedIn) which Canva often stores as annotations.
+            if uris:
+                reconstructed = reconstructed + "\n" + "\n".join(uris)
 
             return _normalize_extracted_text(reconstructed)
 
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
+        with pdfplumber.open(_open_stream(pdf)) as doc:
+            for page in doc.pages:
                 page_text = page.extract_text(x_tolerance=1, y_tolerance=1)
                 if page_text:
                     text += page_text + "\n"
@@ -1,69 +1,221 @@
+import asyncio
+import logging
+import os
+import tempfile
 import uuid
+from collections import OrderedDict
+from typing import AsyncIterator
+import httpx
+from fastapi import UploadFile
+from app.config import get_settings
 from app.database import get_supabase
 
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class _ByteLRU:
+    """Bytes by key, evicting least recently used entries beyond `max_bytes` in total."""
+
+    def __init__(self, max_bytes: int):
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self.max_bytes = max_bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> bytes | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: bytes) -> None:
+        self.pop(key)
+        self._data[key] = value
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes and self._data:
+            _, evicted = self._data.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def pop(self, key: str) -> bytes | None:
+        value = self._data.pop(key, None)
+        if value is not None:
+            self._bytes -= len(value)
+        return value
+
+
 # In-memory storage fallback
-_memory_storage: dict[str, bytes] = {}
+_memory_storage = _ByteLRU(settings.memory_storage_max_mb * 1024 * 1024)
+
+# Local copies of bytes uploaded to Supabase by this process, keyed by URL,
+# so downloads can be served without a roundtrip back to Supabase
+_local_copies = _ByteLRU(settings.local_copies_max_mb * 1024 * 1024)
+
+# URL scheme of files held in _memory_storage
+_MEMORY_PREFIX = "memory://"
+_MEMORY_PREFIX_LEN = len(_MEMORY_PREFIX)
+
+# Read size used when streaming uploads
+_CHUNK_SIZE = 64 * 1024
+
+
+async def _read_chunks(file: UploadFile) -> bytes:
+    """Read an upload in fixed-size chunks."""
+    await file.seek(0)
+    buf = bytearray()
+    while chunk := await file.read(_CHUNK_SIZE):
+        buf += chunk
+    return bytes(buf)
+
+
+async def _spool_to_disk(file: UploadFile) -> str:
+    """Stream an upload into a temporary file and return its path."""
+    await file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        while chunk := await file.read(_CHUNK_SIZE):
+            tmp.write(chunk)
+    return tmp.name
+
+
+def _upload_path(bucket, file_id: str, path: str, content_type: str) -> None:
+    """Upload a file from disk (blocking; run in a worker thread)."""
+    with open(path, "rb") as fh:
+        bucket.upload(file_id, fh, {"content-type": content_type})
 
 
-async def upload_file(file_bytes: bytes, filename: str, content_type: str = "application/octet-stream") -> str:
-    """Upload file to storage and return URL."""
+async def upload_file(file: bytes | UploadFile, filename: str, content_type: str = "application/octet-stream") -> str:
+    """Upload file to storage and return URL.
+
+    Accepts raw bytes or an `UploadFile`; uploads are streamed in chunks
+    rather than read into memory in one go.
+    """
     file_id = f"{uuid.uuid4()}/{filename}"
     
     supabase = get_supabase()
     if supabase:
         try:
-            supabase.storage.from_("cv-files").upload(
-                file_id,
-                file_bytes,
-                {"content-type": content_type}
-            )
+            bucket = supabase.storage.from_("cv-files")
+            if isinstance(file, bytes):
+                await asyncio.to_thread(bucket.upload, file_id, file, {"content-type": content_type})
+            else:
+                tmp_path = await _spool_to_disk(file)
+                try:
+                    await asyncio.to_thread(_upload_path, bucket, file_id, tmp_path, content_type)
+                finally:
+                    os.remove(tmp_path)
             # Get public URL
             url = supabase.storage.from_("cv-files").get_public_url(file_id)
+            if isinstance(file, bytes):
+                _local_copies[url] = file
             return url
         except Exception as e:
-            print(f"Supabase storage error: {e}")
-            # Fall back to memory
-            _memory_storage[file_id] = file_bytes
-            return f"memory://{file_id}"
+            logger.warning("Supabase storage error, keeping the file in memory: %s", e)
     
     # Memory storage fallback
-    _memory_storage[file_id] = file_bytes
-    return f"memory://{file_id}"
+    _memory_storage[file_id] = file if isinstance(file, bytes) else await _read_chunks(file)
+    return f"{_MEMORY_PREFIX}{file_id}"
 
 
 async def get_file(file_url: str) -> bytes:
     """Get file from storage."""
-    if file_url.startswith("memory://"):
-        file_id = file_url.replace("memory://", "")
-        return _memory_storage.get(file_id, b"")
+    if file_url.startswith(_MEMORY_PREFIX):
+        file_id = file_url[_MEMORY_PREFIX_LEN:]
+        return _memory_storage.get(file_id) or b""
+    
+    local_copy = _local_copies.get(file_url)
+    if local_copy is not None:
+        return local_copy
     
     supabase = get_supabase()
     if supabase and "supabase" in file_url:
         try:
             # Extract path from URL
-            path = file_url.split("/cv-files/")[-1]
-            response = supabase.storage.from_("cv-files").download(path)
+            path = file_url.rpartition("/cv-files/")[2]
+            response = await asyncio.to_thread(supabase.storage.from_("cv-files").download, path)
             return response
         except Exception as e:
-            print(f"Error downloading file: {e}")
+            logger.warning("Error downloading file: %s", e)
             return b""
     
     return b""
 
 
+async def iter_file(file_url: str) -> AsyncIterator[bytes]:
+    """Yield a stored file in chunks, so callers never hold a full remote copy."""
+    if file_url.startswith(_MEMORY_PREFIX) or file_url in _local_copies:
+        data = memoryview(await get_file(file_url))
+        for start in range(0, len(data), _CHUNK_SIZE):
+            yield bytes(data[start:start + _CHUNK_SIZE])
+        return
+    
+    supabase = get_supabase()
+    if supabase and "supabase" in file_url:
+        path = file_url.rpartition("/cv-files/")[2]
+        headers = {"apikey": settings.supabase_key, "Authorization": f"Bearer {settings.supabase_key}"}
+        try:
+            async with httpx.AsyncClient() as http:
+                async with http.stream(
+                    "GET", f"{settings.supabase_url}/storage/v1/object/cv-files/{path}", headers=headers
+                ) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                        yield chunk
+        except Exception:
+            # Re-raised so the response is aborted rather than ending as a truncated file
+            logger.exception("Error downloading file %s", path)
+            raise
+
+
+async def create_signed_url(file_url: str, expires_in: int = 300, download_name: str | None = None) -> str | None:
+    """
+    Create a short-lived signed URL so clients can fetch a Supabase file directly.
+    Returns None for files this process can serve itself (memory storage or a
+    local copy) and when signing fails.
+    """
+    if file_url.startswith(_MEMORY_PREFIX) or file_url in _local_copies:
+        return None
+    
+    supabase = get_supabase()
+    if supabase and "supabase" in file_url:
+        try:
+            path = file_url.rpartition("/cv-files/")[2]
+            options = {"download": download_name} if download_name else None
+            result = await asyncio.to_thread(
+                supabase.storage.from_("cv-files").create_signed_url, path, expires_in, options
+            )
+            return result.get("signedURL")
+        except Exception as e:
+            logger.warning("Error signing file URL: %s", e)
+    
+    return None
+
+
+def forget_local_copies(*file_urls: str | None) -> None:
+    """Drop local copies kept for the given URLs."""
+    for url in file_urls:
+        if url:
+            _local_copies.pop(url)
+
+
 async def delete_file(file_url: str) -> bool:
     """Delete file from storage."""
-    if file_url.startswith("memory://"):
-        file_id = file_url.replace("memory://", "")
-        if file_id in _memory_storage:
-            del _memory_storage[file_id]
+    if file_url.startswith(_MEMORY_PREFIX):
+        file_id = file_url[_MEMORY_PREFIX_LEN:]
+        _memory_storage.pop(file_id)
         return True
     
+    forget_local_copies(file_url)
     supabase = get_supabase()
     if supabase and "supabase" in file_url:
         try:
-            path = file_url.split("/cv-files/")[-1]
-            supabase.storage.from_("cv-files").remove([path])
+            path = file_url.rpartition("/cv-files/")[2]
+            await asyncio.to_thread(supabase.storage.from_("cv-files").remove, [path])
             return True
         except:
             pass
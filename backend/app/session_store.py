@@ -1,30 +1,175 @@
-from app.models import Session, SessionStatus, ParsedCV, GapAnalysis, InterviewQuestion, CVComparison
+from app.models import (
+    Session, SessionStatus, ParsedCV, GapAnalysis, InterviewQuestion, CVComparison, QUESTION_LIST_ADAPTER,
+    utcnow
+)
+from app.config import get_settings
 from app.database import get_supabase
-from datetime import datetime
+from app.services.storage import delete_file
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from postgrest import ReturnMethod
+from typing import Protocol
+import asyncio
+import orjson
 import uuid
-import json
-
-# In-memory fallback when Supabase is not configured
-_sessions: dict[str, Session] = {}
-
-
-def _session_to_dict(session: Session) -> dict:
-    """Convert session to dict for database storage."""
-    return {
-        "id": session.id,
-        "status": session.status.value,
-        "original_cv_url": session.original_cv_url,
-        "parsed_cv": session.parsed_cv.model_dump() if session.parsed_cv else None,
-        "job_description": session.job_description,
-        "gap_analysis": session.gap_analysis.model_dump() if session.gap_analysis else None,
-        "questions": [q.model_dump() for q in session.questions],
-        "current_question_index": session.current_question_index,
-        "generated_cv_url": session.generated_cv_url,
-        "generated_docx_url": session.generated_docx_url,
-        "optimized_cv": session.optimized_cv.model_dump() if session.optimized_cv else None,
-        "cv_comparison": session.cv_comparison.model_dump() if session.cv_comparison else None,
-        "created_at": session.created_at.isoformat(),
-    }
+
+settings = get_settings()
+
+# In-memory fallback when Supabase is not configured (LRU order, bounded)
+_sessions: OrderedDict[str, Session] = OrderedDict()
+
+# Opt-in (SESSION_POOL_SIZE, single worker only) LRU of hot sessions loaded from an
+# external store, so repeated reads reuse the same instance instead of fetching and
+# re-parsing it
+_session_pool: OrderedDict[str, Session] = OrderedDict()
+
+
+def _pool_get(session_id: str) -> Session | None:
+    session = _session_pool.get(session_id)
+    if session is None:
+        return None
+    # The external store has expired it by now; don't outlive it here
+    if _is_expired(session):
+        del _session_pool[session_id]
+        return None
+    _session_pool.move_to_end(session_id)
+    session.touch()
+    return session
+
+
+def _pool_put(session: Session) -> None:
+    if settings.session_pool_size <= 0:
+        return
+    _session_pool[session.id] = session
+    _session_pool.move_to_end(session.id)
+    while len(_session_pool) > settings.session_pool_size:
+        _session_pool.popitem(last=False)
+
+
+class SessionBackend(Protocol):
+    """External key-value store holding serialized sessions."""
+
+    async def get(self, session_id: str) -> Session | None: ...
+
+    async def set(self, session: Session) -> None: ...
+
+    async def delete(self, session_id: str) -> bool: ...
+
+
+class RedisSessionBackend:
+    """Sessions stored as JSON in Redis, expiring `ttl` seconds after the last read or write."""
+
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    async def get(self, session_id: str) -> Session | None:
+        raw = await self._client.getex(self._key(session_id), ex=self._ttl)
+        return Session.model_validate_json(raw) if raw else None
+
+    async def set(self, session: Session) -> None:
+        await self._client.setex(self._key(session.id), self._ttl, session.model_dump_json().encode())
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self._client.delete(self._key(session_id)))
+
+
+class MemcachedSessionBackend:
+    """Sessions stored as JSON in Memcached, expiring `ttl` seconds after the last read or write."""
+
+    def __init__(self, host: str, port: int, ttl: int):
+        import aiomcache
+
+        self._client = aiomcache.Client(host, port)
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> bytes:
+        return f"session:{session_id}".encode()
+
+    async def get(self, session_id: str) -> Session | None:
+        raw = await self._client.get(self._key(session_id))
+        if not raw:
+            return None
+        await self._client.touch(self._key(session_id), self._ttl)
+        return Session.model_validate_json(raw)
+
+    async def set(self, session: Session) -> None:
+        await self._client.set(self._key(session.id), session.model_dump_json().encode(), exptime=self._ttl)
+
+    async def delete(self, session_id: str) -> bool:
+        return await self._client.delete(self._key(session_id))
+
+
+def _is_expired(session: Session) -> bool:
+    """Idle for longer than the session TTL (sliding: every read or save restarts it)."""
+    return session.last_accessed < utcnow() - timedelta(seconds=settings.session_ttl_seconds)
+
+
+async def _delete_session_files(session: Session) -> None:
+    """Best-effort removal of files referenced by an evicted session."""
+    for url in (session.original_cv_url, session.generated_cv_url, session.generated_docx_url):
+        if url:
+            await delete_file(url)
+
+
+async def _store_memory_session(session: Session) -> None:
+    """Store a session in memory, evicting expired and least recently used ones."""
+    _sessions[session.id] = session
+    _sessions.move_to_end(session.id)
+    while _sessions:
+        oldest = next(iter(_sessions.values()))
+        if len(_sessions) <= settings.memory_session_limit and not _is_expired(oldest):
+            break
+        _sessions.popitem(last=False)
+        await _delete_session_files(oldest)
+
+
+@lru_cache()
+def get_session_backend() -> SessionBackend | None:
+    """Get the external session backend selected by SESSION_BACKEND, if any."""
+    backend = settings.session_backend.strip().lower()
+    if backend == "redis":
+        return RedisSessionBackend(settings.redis_url, settings.session_ttl_seconds)
+    if backend == "memcached":
+        return MemcachedSessionBackend(settings.memcached_host, settings.memcached_port, settings.session_ttl_seconds)
+    return None
+
+
+def _json_column(model) -> dict | None:
+    """JSON-ready column value for a nested model, serialized by pydantic-core and parsed by orjson."""
+    return orjson.loads(model.model_dump_json()) if model is not None else None
+
+
+# Database column value for each Session field
+_COLUMN_SERIALIZERS = {
+    "id": lambda s: s.id,
+    "status": lambda s: s.status.value,
+    "original_cv_url": lambda s: s.original_cv_url,
+    "parsed_cv": lambda s: _json_column(s.parsed_cv),
+    "job_description": lambda s: s.job_description,
+    "gap_analysis": lambda s: _json_column(s.gap_analysis),
+    "questions": lambda s: orjson.loads(QUESTION_LIST_ADAPTER.dump_json(s.questions)),
+    "current_question_index": lambda s: s.current_question_index,
+    "generated_cv_url": lambda s: s.generated_cv_url,
+    "generated_docx_url": lambda s: s.generated_docx_url,
+    "optimized_cv": lambda s: _json_column(s.optimized_cv),
+    "cv_comparison": lambda s: _json_column(s.cv_comparison),
+    "created_at": lambda s: s.created_at.isoformat(),
+}
+
+
+def _session_to_dict(session: Session, fields: set[str] | None = None) -> dict:
+    """Convert session to dict for database storage (only `fields`, if given)."""
+    names = _COLUMN_SERIALIZERS if fields is None else fields
+    return {name: _COLUMN_SERIALIZERS[name](session) for name in names}
 
 
 def _dict_to_session(data: dict) -> Session:
@@ -42,61 +187,188 @@ def _dict_to_session(data: dict) -> Session:
         generated_docx_url=data.get("generated_docx_url"),
         optimized_cv=ParsedCV(**data["optimized_cv"]) if data.get("optimized_cv") else None,
         cv_comparison=CVComparison(**data["cv_comparison"]) if data.get("cv_comparison") else None,
-        created_at=datetime.fromisoformat(data["created_at"]) if isinstance(data.get("created_at"), str) else data.get("created_at", datetime.now()),
+        created_at=datetime.fromisoformat(data["created_at"]) if isinstance(data.get("created_at"), str) else data.get("created_at", utcnow()),
     )
 
 
-def create_session() -> Session:
+# Supabase session writes, batched: each update_session call queues its row and waits
+# for it, while a background task sends everything queued so far in one concurrent batch
+# (several updates of the same session are merged into one request)
+_WRITE_BATCH_MAX = 32
+_write_queue: asyncio.Queue[tuple[str, dict, asyncio.Future]] | None = None
+_flush_task: asyncio.Task | None = None
+
+
+def _write_session_row(session_id: str, row: dict) -> None:
+    supabase = get_supabase()
+    # Minimal return: PostgREST does not echo the updated row back
+    supabase.table("sessions").update(row, returning=ReturnMethod.minimal).eq("id", session_id).execute()
+
+
+async def _flush_loop(queue: asyncio.Queue) -> None:
+    """Drain queued session writes and send each batch concurrently."""
+    while True:
+        batch = [await queue.get()]
+        try:
+            while len(batch) < _WRITE_BATCH_MAX:
+                if queue.empty():
+                    # Quiet: send now. Busy (more than 4 writes already waiting): give
+                    # concurrent requests 10ms to join this batch first
+                    if len(batch) <= 4:
+                        break
+                    await asyncio.sleep(0.01)
+                    if queue.empty():
+                        break
+                batch.append(queue.get_nowait())
+            
+            rows: dict[str, dict] = {}
+            waiters: dict[str, list[asyncio.Future]] = {}
+            for session_id, row, future in batch:
+                rows.setdefault(session_id, {}).update(row)
+                waiters.setdefault(session_id, []).append(future)
+            
+            results = await asyncio.gather(
+                *(asyncio.to_thread(_write_session_row, session_id, row) for session_id, row in rows.items()),
+                return_exceptions=True,
+            )
+            for session_id, result in zip(rows, results):
+                for future in waiters[session_id]:
+                    if future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(None)
+        except BaseException as e:
+            # Never leave a caller waiting on a write this batch took off the queue
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e if isinstance(e, Exception) else RuntimeError("Session write aborted"))
+            if not isinstance(e, Exception):
+                raise
+
+
+async def _write_session(session: Session, fields: set[str]) -> None:
+    """Queue a Supabase write of the given session fields and wait until it has been sent."""
+    global _write_queue, _flush_task
+    loop = asyncio.get_running_loop()
+    if _flush_task is None or _flush_task.done() or _flush_task.get_loop() is not loop:
+        # A restarted task keeps this loop's queue, so writes already waiting in it are still sent
+        if _write_queue is None or _flush_task is None or _flush_task.get_loop() is not loop:
+            _write_queue = asyncio.Queue()
+        _flush_task = asyncio.create_task(_flush_loop(_write_queue))
+    future = loop.create_future()
+    # Serialized now, so later in-place changes to the session cannot leak into this write
+    await _write_queue.put((session.id, _session_to_dict(session, fields), future))
+    await future
+
+
+async def create_session() -> Session:
     """Create a new session."""
     session_id = str(uuid.uuid4())
-    session = Session(
-        id=session_id,
-        created_at=datetime.now()
-    )
+    session = Session(id=session_id)
+    
+    backend = get_session_backend()
+    if backend:
+        await backend.set(session)
+        _pool_put(session)
+        return session
     
     supabase = get_supabase()
     if supabase:
-        supabase.table("sessions").insert(_session_to_dict(session)).execute()
+        row = _session_to_dict(session)
+        await asyncio.to_thread(lambda: supabase.table("sessions").insert(row).execute())
+        _pool_put(session)
     else:
-        _sessions[session_id] = session
+        await _store_memory_session(session)
     
     return session
 
 
-def get_session(session_id: str) -> Session | None:
+async def get_session(session_id: str) -> Session | None:
     """Get session by ID."""
+    backend = get_session_backend()
     supabase = get_supabase()
     
+    if backend or supabase:
+        session = _pool_get(session_id)
+        if session is not None:
+            return session
+    
+    if backend:
+        session = await backend.get(session_id)
+        if session is not None:
+            _pool_put(session)
+        return session
+    
     if supabase:
-        result = supabase.table("sessions").select("*").eq("id", session_id).execute()
+        result = await asyncio.to_thread(
+            lambda: supabase.table("sessions").select("*").eq("id", session_id).execute()
+        )
         if result.data:
-            return _dict_to_session(result.data[0])
+            session = _dict_to_session(result.data[0])
+            _pool_put(session)
+            return session
         return None
     else:
-        return _sessions.get(session_id)
+        session = _sessions.get(session_id)
+        if session is None:
+            return None
+        if _is_expired(session):
+            del _sessions[session_id]
+            await _delete_session_files(session)
+            return None
+        _sessions.move_to_end(session_id)
+        session.touch()
+        return session
 
 
-def update_session(session: Session) -> Session:
+async def update_session(session: Session) -> Session:
     """Update session."""
+    session.clear_cached_payloads()
+    session.touch()
+    
+    backend = get_session_backend()
+    if backend:
+        # The whole session is written; nothing is left pending
+        session.pop_dirty_fields()
+        await backend.set(session)
+        _pool_put(session)
+        return session
+    
     supabase = get_supabase()
     
     if supabase:
-        supabase.table("sessions").update(_session_to_dict(session)).eq("id", session.id).execute()
+        # Only the fields changed since the last save are sent
+        fields = session.pop_dirty_fields()
+        if fields:
+            try:
+                await _write_session(session, fields)
+            except BaseException:
+                session.mark_dirty(*fields)
+                raise
+        _pool_put(session)
     else:
-        _sessions[session.id] = session
+        await _store_memory_session(session)
     
     return session
 
 
-def delete_session(session_id: str) -> bool:
+async def delete_session(session_id: str) -> bool:
     """Delete session and all associated data."""
+    _session_pool.pop(session_id, None)
+    
+    backend = get_session_backend()
+    if backend:
+        return await backend.delete(session_id)
+    
     supabase = get_supabase()
     
     if supabase:
-        supabase.table("sessions").delete().eq("id", session_id).execute()
+        await asyncio.to_thread(lambda: supabase.table("sessions").delete().eq("id", session_id).execute())
         # Also delete files from storage
         try:
-            supabase.storage.from_("cv-files").remove([f"{session_id}/"])
+            await asyncio.to_thread(supabase.storage.from_("cv-files").remove, [f"{session_id}/"])
         except:
             pass
         return True
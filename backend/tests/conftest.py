@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings require an OpenAI key at import time; tests never call the API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+
+from app.services import ai_service
+
+
+def _reply(custom_id: str, name: str, finish_reason: str = "stop") -> bytes:
+    content = orjson.dumps({"personal_info": {"name": name}}).decode()
+    choice = {"finish_reason": finish_reason, "message": {"content": content}}
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "response": {"status_code": 200, "body": {"choices": [choice]}},
+    })
+
+
+class _FakeBatchClient:
+    """Batch API stand-in whose output has cv-1 failed, cv-3 missing (expired) and cv-4 cut off."""
+
+    def __init__(self):
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    async def _create_file(self, file, purpose):
+        return SimpleNamespace(id="file-in")
+
+    async def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1")
+
+    async def _retrieve(self, batch_id):
+        return SimpleNamespace(status="completed", output_file_id="file-out")
+
+    async def _content(self, file_id):
+        failed = orjson.dumps({"custom_id": "cv-1", "response": {"status_code": 500, "body": {}}})
+        lines = [_reply("cv-0", "Ada"), failed, _reply("cv-2", "Grace"), _reply("cv-4", "Linus", "length")]
+        return SimpleNamespace(text=b"\n".join(lines).decode())
+
+
+def test_parse_cvs_batch_keeps_results_aligned_with_inputs(monkeypatch):
+    monkeypatch.setattr(ai_service, "client", _FakeBatchClient())
+    monkeypatch.setattr(ai_service.settings, "use_batch_api", True)
+
+    texts = ["cv zero", "cv one", "cv two", "cv three", "cv four"]
+    results = asyncio.run(ai_service.parse_cvs_batch(texts))
+
+    assert len(results) == len(texts)
+    assert results[0].personal_info.name == "Ada" and results[0].raw_text == "cv zero"
+    assert results[1] is None
+    assert results[2].personal_info.name == "Grace" and results[2].raw_text == "cv two"
+    assert results[3] is None
+    assert results[4] is None
+
+
+def test_parse_cvs_batch_maps_failed_direct_parses_to_none(monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "use_batch_api", False)
+
+    async def fake_parse(text):
+        if text == "bad":
+            raise ai_service.AIResponseTruncatedError("cut off")
+        return ai_service.ParsedCV(raw_text=text)
+
+    monkeypatch.setattr(ai_service, "parse_cv_with_ai", fake_parse)
+
+    results = asyncio.run(ai_service.parse_cvs_batch(["good", "bad", "also good"]))
+
+    assert [r.raw_text if r else None for r in results] == ["good", None, "also good"]
@@ -0,0 +1,21 @@
+from app.services import ai_cache
+
+
+def _request(**options):
+    return dict(
+        model="gpt-4o-mini",
+        messages=[{"role": "system", "content": "Parse."}, {"role": "user", "content": "CV"}],
+        **options,
+    )
+
+
+def test_cache_key_covers_every_request_option():
+    base = ai_cache._cache_key("CV", _request(max_tokens=100, temperature=0.1))
+
+    assert base == ai_cache._cache_key("CV", _request(temperature=0.1, max_tokens=100))
+    assert base != ai_cache._cache_key("CV", _request(max_tokens=200, temperature=0.1))
+    assert base != ai_cache._cache_key("CV", _request(max_tokens=100, temperature=0.7))
+    assert base != ai_cache._cache_key("CV", _request(max_tokens=100, temperature=0.1, seed=1))
+    assert base != ai_cache._cache_key(
+        "CV", _request(max_tokens=100, temperature=0.1, response_format={"type": "json_object"})
+    )
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import ParsedCV
+from app.services import ai_service
+
+
+class _FakeCompletions:
+    """chat.completions stand-in returning the given (finish_reason, content) replies in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        finish_reason, content = self.replies.pop(0)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(finish_reason=finish_reason, message=message)])
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    def install(*replies):
+        fake = _FakeCompletions(replies)
+        monkeypatch.setattr(ai_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+        monkeypatch.setattr(ai_service.settings, "ai_cache_size", 0)
+        return fake
+    return install
+
+
+def test_truncated_reply_is_retried_with_a_higher_cap(completions):
+    full = orjson.dumps({"personal_info": {"name": "Ada"}}).decode()
+    fake = completions(("length", full[:10]), ("stop", full))
+
+    parsed = asyncio.run(ai_service.parse_cv_with_ai("Ada Lovelace"))
+
+    assert parsed.personal_info.name == "Ada"
+    caps = [call["max_tokens"] for call in fake.calls]
+    assert caps == [ai_service._PARSE_CV_MAX_TOKENS, 2 * ai_service._PARSE_CV_MAX_TOKENS]
+
+
+def test_reply_truncated_twice_raises_a_domain_error(completions):
+    completions(("length", '{"personal_info": {"na'), ("length", '{"personal_info": {"name": "A'))
+
+    with pytest.raises(ai_service.AIResponseTruncatedError):
+        asyncio.run(ai_service.parse_cv_with_ai("Ada Lovelace"))
+
+
+def test_truncated_reply_surfaces_as_502(completions, monkeypatch):
+    from app import main, session_store
+
+    monkeypatch.setattr(session_store, "get_supabase", lambda: None)
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: None)
+    completions(("length", '{"skills_gaps": ['), ("length", '{"skills_gaps": [{"id'))
+
+    with TestClient(main.app) as http:
+        session_id = http.post("/api/v1/session/create").json()["session_id"]
+        session_store._sessions[session_id].parsed_cv = ParsedCV()
+        response = http.post("/api/v1/analyze", json={"session_id": session_id, "job_description": "JD"})
+
+    assert response.status_code == 502
+    assert "cut off" in response.json()["detail"]
@@ -0,0 +1,22 @@
+from app.models import Education, Experience, ParsedCV, PersonalInfo
+from app.services import cv_generator
+
+_CV = ParsedCV(
+    personal_info=PersonalInfo(name="Ada Lovelace", email="ada@example.com"),
+    summary="Engineer & analyst <with> markup characters.",
+    experience=[Experience(company="Analytical Engines", title="Engineer", start_date="1842",
+                           achievements=["Wrote the first program"])],
+    education=[Education(institution="Home", degree="Mathematics")],
+    skills=["Python", "AWS", "Leadership"],
+    languages=["English"],
+)
+
+
+def test_render_functions_load_their_libraries_on_first_use():
+    pdf = cv_generator.create_cv_pdf(_CV)
+    docx = cv_generator.create_cv_docx(_CV)
+
+    assert pdf.startswith(b"%PDF")
+    assert docx.startswith(b"PK")
+    assert cv_generator._pdf_kit() is cv_generator._pdf_kit()
+    assert cv_generator._docx_kit() is cv_generator._docx_kit()
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from app import database
+
+
+def test_get_supabase_builds_one_client_under_concurrent_first_calls(monkeypatch):
+    calls = []
+
+    def slow_create_client(url, key):
+        calls.append((url, key))
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(database, "create_client", slow_create_client)
+    monkeypatch.setattr(database, "_client", None)
+    monkeypatch.setattr(database.settings, "supabase_url", "https://example.supabase.co")
+    monkeypatch.setattr(database.settings, "supabase_key", "key")
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(database.get_supabase())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r is results[0] for r in results)
+
+
+def test_get_supabase_without_config_returns_none(monkeypatch):
+    monkeypatch.setattr(database.settings, "supabase_url", "")
+    assert database.get_supabase() is None
@@ -0,0 +1,20 @@
+from collections import OrderedDict
+
+from app.services import pdf_parser
+
+
+def test_extracted_text_cache_expires(monkeypatch):
+    now = [1000.0]
+    extractions = []
+    monkeypatch.setattr(pdf_parser.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(pdf_parser, "_extract_cache", OrderedDict())
+    monkeypatch.setattr(pdf_parser, "_extract_text", lambda pdf: extractions.append(pdf) or "CV text")
+
+    assert pdf_parser.extract_text_from_pdf(b"%PDF cv") == "CV text"
+    assert pdf_parser.extract_text_from_pdf(b"%PDF cv") == "CV text"
+    assert len(extractions) == 1
+
+    # Past the TTL the text is dropped, even without a lookup of that PDF
+    now[0] += pdf_parser._EXTRACT_CACHE_TTL_SECONDS + 1
+    pdf_parser.extract_text_from_pdf(b"%PDF other")
+    assert list(pdf_parser._extract_cache) == [pdf_parser._content_key(b"%PDF other")]
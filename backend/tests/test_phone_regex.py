@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.ai_service import _PHONE_RE
+
+
+@pytest.mark.parametrize("text, phone", [
+    ("+216 54 051 820", "+216 54 051 820"),
+    ("Tel: +1 (555) 123-4567.", "+1 (555) 123-4567"),
+    ("+44 20 7946 0958", "+44 20 7946 0958"),
+    ("+49 (0)30 1234567", "+49 (0)30 1234567"),
+    ("+21654051820 amine-abbassi", "+21654051820"),
+    ("(555) 123-4567", "(555) 123-4567"),
+    ("06 12 34 56 78", "06 12 34 56 78"),
+    ("0171 234 5678", "0171 234 5678"),
+    ("call 555-123-4567 now", "555-123-4567"),
+    ("555.123.4567", "555.123.4567"),
+    ("Phone: 5551234567", "5551234567"),
+    ("Tel 54 051 820", "54 051 820"),
+    ("54-051-820 | Tunis", "54-051-820"),
+])
+def test_phone_regex_matches_phone_numbers(text, phone):
+    match = _PHONE_RE.search(text)
+    assert match is not None and match.group() == phone
+
+
+@pytest.mark.parametrize("text", [
+    "2019-2021",
+    "2019 2020 2021",
+    "2020 - 2023",
+    "05/2025 – 10/2025",
+    "1234 5678 9012",
+    "ID 123456789",
+    "Score 1234-5678",
+    "75008 Paris",
+    "12 34 56 78",
+    "+1 23",
+    "Ref 55512345678",
+    "2019 202 2021",
+])
+def test_phone_regex_rejects_dates_and_ids(text):
+    assert _PHONE_RE.search(text) is None
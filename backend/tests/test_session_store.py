@@ -0,0 +1,159 @@
+import asyncio
+from datetime import timedelta
+
+from postgrest import ReturnMethod
+
+from app import session_store
+from app.models import ParsedCV, PersonalInfo, SessionStatus
+
+
+class _FakeTable:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def insert(self, row):
+        self.calls.append(("insert", row, None))
+        return self
+
+    def update(self, row, returning=ReturnMethod.representation):
+        self.calls.append(("update", row, returning))
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        return None
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        assert name == "sessions"
+        return _FakeTable(self.calls)
+
+
+def test_update_session_sends_only_changed_fields_with_minimal_return(monkeypatch):
+    supabase = _FakeSupabase()
+    monkeypatch.setattr(session_store, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: None)
+
+    async def scenario():
+        session = await session_store.create_session()
+        session.status = SessionStatus.ANALYZED
+        session.job_description = "JD"
+        await session_store.update_session(session)
+
+    asyncio.run(scenario())
+
+    updates = [(row, returning) for op, row, returning in supabase.calls if op == "update"]
+    assert updates == [({"status": "analyzed", "job_description": "JD"}, ReturnMethod.minimal)]
+
+
+def test_update_session_sends_nested_fields_changed_in_place(monkeypatch):
+    supabase = _FakeSupabase()
+    monkeypatch.setattr(session_store, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: None)
+
+    async def scenario():
+        session = await session_store.create_session()
+        session.parsed_cv = ParsedCV(personal_info=PersonalInfo(name="Ada"))
+        await session_store.update_session(session)
+        # Mutated without reassigning parsed_cv
+        session.parsed_cv.personal_info.name = "Ada Lovelace"
+        await session_store.update_session(session)
+        # Nothing changed: nothing sent
+        await session_store.update_session(session)
+
+    asyncio.run(scenario())
+
+    updates = [row for op, row, _ in supabase.calls if op == "update"]
+    assert len(updates) == 2
+    assert updates[1].keys() == {"parsed_cv"}
+    assert updates[1]["parsed_cv"]["personal_info"]["name"] == "Ada Lovelace"
+
+
+def test_write_error_outside_the_batch_fails_its_callers_instead_of_hanging(monkeypatch):
+    supabase = _FakeSupabase()
+    monkeypatch.setattr(session_store, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: None)
+    to_thread = asyncio.to_thread
+    failures = [RuntimeError("flush broke")]
+
+    def flaky_to_thread(func, *args):
+        if func is session_store._write_session_row and failures:
+            raise failures.pop()
+        return to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", flaky_to_thread)
+
+    async def scenario():
+        session = await session_store.create_session()
+        session.job_description = "JD"
+        try:
+            await asyncio.wait_for(session_store.update_session(session), timeout=1)
+        except RuntimeError as e:
+            assert str(e) == "flush broke"
+        else:
+            raise AssertionError("update_session should have failed")
+        # The fields are still pending and the next save sends them
+        await asyncio.wait_for(session_store.update_session(session), timeout=1)
+
+    asyncio.run(scenario())
+
+    updates = [row for op, row, _ in supabase.calls if op == "update"]
+    assert updates == [{"job_description": "JD"}]
+
+
+class _FakeBackend:
+    """External session store recording every read."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.reads = 0
+
+    async def get(self, session_id):
+        self.reads += 1
+        return self.sessions.get(session_id)
+
+    async def set(self, session):
+        self.sessions[session.id] = session
+
+    async def delete(self, session_id):
+        return self.sessions.pop(session_id, None) is not None
+
+
+def test_session_pool_is_off_by_default_so_reads_reach_the_shared_store(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: backend)
+    assert session_store.settings.session_pool_size == 0
+
+    async def scenario():
+        session = await session_store.create_session()
+        await session_store.get_session(session.id)
+        # Another worker deletes it: this worker must not keep serving a copy
+        await backend.delete(session.id)
+        return await session_store.get_session(session.id)
+
+    assert asyncio.run(scenario()) is None
+    assert backend.reads == 2
+
+
+def test_memory_session_ttl_counts_from_last_access(monkeypatch):
+    monkeypatch.setattr(session_store, "get_session_backend", lambda: None)
+    monkeypatch.setattr(session_store, "get_supabase", lambda: None)
+    monkeypatch.setattr(session_store, "_sessions", session_store.OrderedDict())
+    ttl = timedelta(seconds=session_store.settings.session_ttl_seconds)
+
+    async def scenario():
+        session = await session_store.create_session()
+        # Created two TTLs ago but read just now: still alive
+        session.created_at -= 2 * ttl
+        assert await session_store.get_session(session.id) is session
+        # Idle for longer than the TTL: gone
+        session._last_accessed -= 2 * ttl
+        return await session_store.get_session(session.id)
+
+    assert asyncio.run(scenario()) is None
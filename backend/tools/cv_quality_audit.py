@@ -30,11 +30,13 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import heapq
 import json
 import os
 import re
 import sys
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
@@ -64,11 +66,11 @@ def _load_dotenv_if_present() -> None:
     load_dotenv(dotenv_path=str(ROOT.parent / ".env"), override=False)
 
 
-ACTION_VERBS = {
+ACTION_VERBS = frozenset({
     "led", "built", "developed", "implemented", "architected", "optimized", "designed", "delivered",
     "improved", "reduced", "increased", "launched", "automated", "migrated", "owned", "created",
     "scaled", "refactored", "shipped", "deployed", "integrated", "managed", "mentored", "coordinated",
-}
+})
 
 BANNED_PHRASES = [
     "responsible for",
@@ -78,6 +80,20 @@ BANNED_PHRASES = [
     "driven",
 ]
 
+# All banned phrases in one pass per bullet (none of them overlaps another)
+_BANNED_RE = re.compile("|".join(re.escape(p) for p in BANNED_PHRASES))
+
+_SPLIT_RE = re.compile(r"\s+")
+
+_STOPWORDS = frozenset({
+    "the","and","for","with","you","your","our","are","will","this","that","from","have","has","had","not",
+    "but","all","any","can","may","able","must","should","role","team","work","skills","experience","years",
+    "using","use","we","they","their","within","across","including","provide","ensure","build","design",
+    "about","into","over","under","etc","such","as","a","an","to","of","in","on","at","by","or","is","be",
+})
+
+_TOKEN_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9\.\+#/-]{2,}")
+
 METRIC_RE = re.compile(r"(\b\d+(\.\d+)?\b|\b\d{1,3}%\b|\$\s?\d+|\b\d+\s?(ms|s|sec|secs|minutes|hrs|hours)\b|\b\d+\s?(k|m|b)\b)", re.I)
 
 
@@ -108,29 +124,20 @@ def cv_to_text(cv: ParsedCV) -> str:
     return "\n".join([p for p in parts if p and str(p).strip()])
 
 
+def _tokenize(text: str) -> list[str]:
+    """Lowercased word tokens (tech names like "node.js" or "c++" kept whole)."""
+    return [t.strip(".,;:()[]{}") for t in _TOKEN_RE.findall(text.lower())]
+
+
 def extract_keywords(job_description: str, top_n: int = 25) -> list[str]:
     """
     Very lightweight keyword extraction:
     - keep words 3+ chars
     - remove common stopwords
-    - rank by frequency
+    - rank by frequency (ties alphabetical)
     """
-    stop = {
-        "the","and","for","with","you","your","our","are","will","this","that","from","have","has","had","not",
-        "but","all","any","can","may","able","must","should","role","team","work","skills","experience","years",
-        "using","use","we","they","their","within","across","including","provide","ensure","build","design",
-        "about","into","over","under","etc","such","as","a","an","to","of","in","on","at","by","or","is","be",
-    }
-    tokens = re.findall(r"[a-zA-Z][a-zA-Z0-9\.\+#/-]{2,}", job_description.lower())
-    freq: dict[str, int] = {}
-    for t in tokens:
-        t = t.strip(".,;:()[]{}")
-        if t in stop:
-            continue
-        if len(t) < 3:
-            continue
-        freq[t] = freq.get(t, 0) + 1
-    return [k for k, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:top_n]]
+    counts = Counter(t for t in _tokenize(job_description) if len(t) >= 3 and t not in _STOPWORDS)
+    return [k for k, _ in heapq.nsmallest(top_n, counts.items(), key=lambda kv: (-kv[1], kv[0]))]
 
 
 def audit_bullets(cv: ParsedCV) -> dict[str, Any]:
@@ -152,15 +159,14 @@ def audit_bullets(cv: ParsedCV) -> dict[str, Any]:
     banned_hits: list[dict[str, str]] = []
 
     for b in bullets:
-        first = re.split(r"\s+", b.strip().lower(), maxsplit=1)[0].strip(".,:;()[]{}")
+        first = _SPLIT_RE.split(b.strip().lower(), maxsplit=1)[0].strip(".,:;()[]{}")
         if first in ACTION_VERBS:
             action_hits += 1
         if METRIC_RE.search(b):
             metric_hits += 1
-        lower = b.lower()
-        for phrase in BANNED_PHRASES:
-            if phrase in lower:
-                banned_hits.append({"phrase": phrase, "bullet": b})
+        found = set(_BANNED_RE.findall(b.lower()))
+        if found:
+            banned_hits.extend({"phrase": phrase, "bullet": b} for phrase in BANNED_PHRASES if phrase in found)
 
     return {
         "total_bullets": len(bullets),
@@ -211,9 +217,10 @@ def audit_integrity(original: ParsedCV, optimized: ParsedCV) -> dict[str, Any]:
 
 def audit_keywords(job_description: str, optimized: ParsedCV) -> dict[str, Any]:
     keywords = extract_keywords(job_description)
-    blob = cv_to_text(optimized).lower()
-    present = [k for k in keywords if k in blob]
-    missing = [k for k in keywords if k not in blob]
+    # Whole-token matches, so "java" is not counted as present in "javascript"
+    cv_tokens = set(_tokenize(cv_to_text(optimized)))
+    present = [k for k in keywords if k in cv_tokens]
+    missing = [k for k in keywords if k not in cv_tokens]
     return {
         "top_keywords": keywords,
         "present_count": len(present),
@@ -255,13 +262,23 @@ async def generate_and_audit(parsed_cv_path: str | None, pdf_path: str | None, j
         parsed_cv, job_description, gap_analysis, answers
     )
 
-    # Save outputs
+    # Dumped once: written to comparison.json and embedded in the report
+    comparison_dict = comparison.model_dump()
+
+    # Save outputs (written concurrently)
     out_dir.mkdir(parents=True, exist_ok=True)
-    (out_dir / "parsed_cv.json").write_text(parsed_cv.model_dump_json(indent=2), encoding="utf-8")
-    (out_dir / "optimized_cv.json").write_text(optimized_cv.model_dump_json(indent=2), encoding="utf-8")
-    (out_dir / "comparison.json").write_text(comparison.model_dump_json(indent=2), encoding="utf-8")
-    (out_dir / "optimized_cv.pdf").write_bytes(create_cv_pdf(optimized_cv))
-    (out_dir / "optimized_cv.docx").write_bytes(create_cv_docx(optimized_cv))
+    outputs: list[tuple[str, str | bytes]] = [
+        ("parsed_cv.json", parsed_cv.model_dump_json(indent=2)),
+        ("optimized_cv.json", optimized_cv.model_dump_json(indent=2)),
+        ("comparison.json", json.dumps(comparison_dict, indent=2, ensure_ascii=False)),
+        ("optimized_cv.pdf", create_cv_pdf(optimized_cv)),
+        ("optimized_cv.docx", create_cv_docx(optimized_cv)),
+    ]
+    await asyncio.gather(*(
+        asyncio.to_thread((out_dir / name).write_bytes, data) if isinstance(data, bytes)
+        else asyncio.to_thread((out_dir / name).write_text, data, encoding="utf-8")
+        for name, data in outputs
+    ))
 
     # Heuristic report
     integrity = audit_integrity(parsed_cv, optimized_cv)
@@ -269,11 +286,11 @@ async def generate_and_audit(parsed_cv_path: str | None, pdf_path: str | None, j
     keywords = audit_keywords(job_description, optimized_cv)
 
     report = {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         "integrity": integrity,
         "bullets": bullets,
         "keywords": keywords,
-        "comparison": comparison.model_dump(),
+        "comparison": comparison_dict,
         "verdict": {
             # Rough heuristic: tune as needed
             "passes_integrity": (len(integrity["missing_jobs"]) == 0 and len(integrity["date_changes"]) == 0 and len(integrity["contact_mismatches"]) == 0),